@@ -10,6 +10,7 @@ This script demonstrates the complete Doc-QA Assistant functionality:
 """
 
 import asyncio
+import os
 import time
 from pathlib import Path
 
@@ -20,54 +21,56 @@ class CapstoneDemo:
     def __init__(self, base_url: str = "http://127.0.0.1:8010"):
         self.base_url = base_url
         self.session_id = f"demo_{int(time.time())}"
+        self.client: httpx.AsyncClient | None = None
+
+    async def _upload(self, path: Path, mime: str) -> httpx.Response:
+        """Upload a single demo document, processing it immediately."""
+        # Read off the event loop so concurrent uploads aren't stalled by file I/O
+        data = await asyncio.to_thread(path.read_bytes)
+        files = {"file": (path.name, data, mime)}
+        return await self.client.post(
+            "/docs/upload",
+            files=files,
+            params={"background": "false"},  # Process immediately for demo
+        )
 
     async def demo_document_upload(self):
         """Demonstrate document upload and processing."""
         print("🔄 PHASE 1: Document Upload & Processing")
         print("=" * 50)
 
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            # Upload company handbook
-            handbook_path = Path("demo_docs/company_handbook.md")
-            with open(handbook_path, "rb") as f:
-                files = {"file": ("company_handbook.md", f, "text/markdown")}
-                response = await client.post(
-                    f"{self.base_url}/docs/upload",
-                    files=files,
-                    params={"background": "false"},  # Process immediately for demo
-                )
-
-            if response.status_code == 200:
-                doc_data = response.json()
-                print(f"✅ Uploaded: {doc_data['document']['filename']}")
-                print(f"   Document ID: {doc_data['document']['id']}")
-                print(f"   Status: {doc_data['document']['status']}")
-                print(f"   Size: {doc_data['document']['size']} bytes")
-            else:
-                print(f"❌ Upload failed: {response.text}")
-                return
-
-            # Upload project guidelines
-            guidelines_path = Path("demo_docs/project_guidelines.md")
-            with open(guidelines_path, "rb") as f:
-                files = {"file": ("project_guidelines.md", f, "text/markdown")}
-                response = await client.post(
-                    f"{self.base_url}/docs/upload", files=files, params={"background": "false"}
-                )
+        handbook_path = Path("demo_docs/company_handbook.md")
+        guidelines_path = Path("demo_docs/project_guidelines.md")
 
-            if response.status_code == 200:
-                doc_data = response.json()
-                print(f"✅ Uploaded: {doc_data['document']['filename']}")
-                print(f"   Document ID: {doc_data['document']['id']}")
-                print(f"   Status: {doc_data['document']['status']}")
+        # Both uploads are independent, so send them concurrently
+        handbook_response, guidelines_response = await asyncio.gather(
+            self._upload(handbook_path, "text/markdown"),
+            self._upload(guidelines_path, "text/markdown"),
+        )
 
-            # List all documents
-            response = await client.get(f"{self.base_url}/docs/")
-            if response.status_code == 200:
-                docs_data = response.json()
-                print(f"\n📚 Total documents: {docs_data['total']}")
-                for doc in docs_data["documents"]:
-                    print(f"   - {doc['filename']} ({doc['status']})")
+        if handbook_response.status_code == 200:
+            doc_data = handbook_response.json()
+            print(f"✅ Uploaded: {doc_data['document']['filename']}")
+            print(f"   Document ID: {doc_data['document']['id']}")
+            print(f"   Status: {doc_data['document']['status']}")
+            print(f"   Size: {doc_data['document']['size']} bytes")
+        else:
+            print(f"❌ Upload failed: {handbook_response.text}")
+            return
+
+        if guidelines_response.status_code == 200:
+            doc_data = guidelines_response.json()
+            print(f"✅ Uploaded: {doc_data['document']['filename']}")
+            print(f"   Document ID: {doc_data['document']['id']}")
+            print(f"   Status: {doc_data['document']['status']}")
+
+        # List all documents
+        response = await self.client.get("/docs/")
+        if response.status_code == 200:
+            docs_data = response.json()
+            print(f"\n📚 Total documents: {docs_data['total']}")
+            for doc in docs_data["documents"]:
+                print(f"   - {doc['filename']} ({doc['status']})")
 
         print("\n")
 
@@ -99,41 +102,50 @@ class CapstoneDemo:
             },
         ]
 
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            for i, test in enumerate(test_questions, 1):
-                print(f"Q{i}: {test['question']}")
-                print(f"Expected route: {test['expected_route']} ({test['description']})")
-
-                response = await client.post(
-                    f"{self.base_url}/chat/",
-                    json={"message": test["question"], "session_id": self.session_id},
+        # Questions are independent, so fire them concurrently. Each gets its own
+        # session so server-side history doesn't interleave between them.
+        responses = await asyncio.gather(
+            *(
+                self.client.post(
+                    "/chat/",
+                    json={"message": test["question"], "session_id": f"{self.session_id}_q{i}"},
                 )
+                for i, test in enumerate(test_questions, 1)
+            ),
+            return_exceptions=True,
+        )
+
+        for i, (test, response) in enumerate(zip(test_questions, responses, strict=True), 1):
+            print(f"Q{i}: {test['question']}")
+            print(f"Expected route: {test['expected_route']} ({test['description']})")
+
+            if isinstance(response, Exception):
+                print(f"❌ Chat failed: {response}")
+            elif response.status_code == 200:
+                chat_data = response.json()
+                actual_route = chat_data["routing_info"]["route"]
+                route_reason = chat_data["routing_info"]["route_reason"]
+
+                print(f"🤖 Actual route: {actual_route} - {route_reason}")
+                print(f"📝 Answer: {chat_data['message'][:150]}...")
 
-                if response.status_code == 200:
-                    chat_data = response.json()
-                    actual_route = chat_data["routing_info"]["route"]
-                    route_reason = chat_data["routing_info"]["route_reason"]
-
-                    print(f"🤖 Actual route: {actual_route} - {route_reason}")
-                    print(f"📝 Answer: {chat_data['message'][:150]}...")
-
-                    # Show sources if available
-                    if chat_data.get("sources"):
-                        print(f"📚 Sources: {len(chat_data['sources'])} documents")
-                        for j, source in enumerate(chat_data["sources"][:2], 1):
-                            relevance = source.get("relevance_score", 0)
-                            source_name = source.get("source", "Unknown")
-                            print(f"   {j}. {source_name} (relevance: {relevance:.2f})")
-
-                    # Check if routing was correct
-                    if actual_route == test["expected_route"]:
-                        print("✅ Routing correct")
-                    else:
-                        print("⚠️  Unexpected routing")
+                # Show sources if available
+                if chat_data.get("sources"):
+                    print(f"📚 Sources: {len(chat_data['sources'])} documents")
+                    for j, source in enumerate(chat_data["sources"][:2], 1):
+                        relevance = source.get("relevance_score", 0)
+                        source_name = source.get("source", "Unknown")
+                        print(f"   {j}. {source_name} (relevance: {relevance:.2f})")
+
+                # Check if routing was correct
+                if actual_route == test["expected_route"]:
+                    print("✅ Routing correct")
                 else:
-                    print(f"❌ Chat failed: {response.text}")
+                    print("⚠️  Unexpected routing")
+            else:
+                print(f"❌ Chat failed: {response.text}")
 
-                print()
+            print()
 
         print()
 
@@ -147,25 +159,24 @@ class CapstoneDemo:
             "security guidelines for dependency management?"
         )
 
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            print(f"Question: {citation_question}")
+        print(f"Question: {citation_question}")
 
-            response = await client.post(
-                f"{self.base_url}/chat/",
-                json={"message": citation_question, "session_id": self.session_id},
-            )
+        response = await self.client.post(
+            "/chat/",
+            json={"message": citation_question, "session_id": self.session_id},
+        )
 
-            if response.status_code == 200:
-                chat_data = response.json()
-                print(f"🤖 Answer:\n{chat_data['message']}")
+        if response.status_code == 200:
+            chat_data = response.json()
+            print(f"🤖 Answer:\n{chat_data['message']}")
 
-                if chat_data.get("sources"):
-                    print(f"\n📚 Sources ({len(chat_data['sources'])} found):")
-                    for i, source in enumerate(chat_data["sources"], 1):
-                        print(f"   {i}. {source.get('source', 'Unknown')}")
-                        print(f"      Relevance: {source.get('relevance_score', 0):.2f}")
-                        print(f"      Document: {source.get('document_id', 'Unknown')}")
-                        print()
+            if chat_data.get("sources"):
+                print(f"\n📚 Sources ({len(chat_data['sources'])} found):")
+                for i, source in enumerate(chat_data["sources"], 1):
+                    print(f"   {i}. {source.get('source', 'Unknown')}")
+                    print(f"      Relevance: {source.get('relevance_score', 0):.2f}")
+                    print(f"      Document: {source.get('document_id', 'Unknown')}")
+                    print()
 
         print()
 
@@ -174,34 +185,53 @@ class CapstoneDemo:
         print("🔄 PHASE 4: Session Management")
         print("=" * 50)
 
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            # Check chat history
-            response = await client.get(f"{self.base_url}/chat/sessions/{self.session_id}/history")
-            if response.status_code == 200:
-                history = response.json()
-                print(f"💬 Session {self.session_id} has {history['total']} exchanges")
+        # Check chat history
+        response = await self.client.get(f"/chat/sessions/{self.session_id}/history")
+        if response.status_code == 200:
+            history = response.json()
+            print(f"💬 Session {self.session_id} has {history['total']} exchanges")
 
-                # Show last few exchanges
-                for i, exchange in enumerate(history["messages"][-2:], 1):
-                    print(f"\nExchange {i}:")
-                    print(f"👤 User: {exchange['user'][:80]}...")
-                    print(f"🤖 Assistant: {exchange['assistant'][:80]}...")
+            # Show last few exchanges
+            for i, exchange in enumerate(history["messages"][-2:], 1):
+                print(f"\nExchange {i}:")
+                print(f"👤 User: {exchange['user'][:80]}...")
+                print(f"🤖 Assistant: {exchange['assistant'][:80]}...")
 
-            # Test follow-up question that should maintain context
-            followup = "Can you tell me more about the first benefit you mentioned?"
-            print(f"\n📝 Follow-up question: {followup}")
+        # Test follow-up question that should maintain context
+        followup = "Can you tell me more about the first benefit you mentioned?"
+        print(f"\n📝 Follow-up question: {followup}")
 
-            response = await client.post(
-                f"{self.base_url}/chat/", json={"message": followup, "session_id": self.session_id}
-            )
+        response = await self.client.post(
+            "/chat/", json={"message": followup, "session_id": self.session_id}
+        )
 
-            if response.status_code == 200:
-                chat_data = response.json()
-                print(f"🤖 Response: {chat_data['message'][:150]}...")
-                print(f"📍 Route: {chat_data['routing_info']['route']}")
+        if response.status_code == 200:
+            chat_data = response.json()
+            print(f"🤖 Response: {chat_data['message'][:150]}...")
+            print(f"📍 Route: {chat_data['routing_info']['route']}")
 
         print()
 
+    @staticmethod
+    def _last_report_row(report_file: Path, block_size: int = 4096) -> str | None:
+        """Return the last data row of a CSV report, reading backwards from the end."""
+        with open(report_file, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            tail = b""
+            # Keep pulling earlier blocks until the newline before the last row is in view
+            while pos > 0 and b"\n" not in tail.rstrip(b"\r\n"):
+                read_size = min(block_size, pos)
+                pos -= read_size
+                f.seek(pos)
+                tail = f.read(read_size) + tail
+
+        lines = tail.decode(errors="ignore").rstrip("\r\n").splitlines()
+        # Reaching the start of the file with only a header means no runs yet
+        if not lines or (pos == 0 and len(lines) < 2):
+            return None
+        return lines[-1]
+
     async def demo_performance_metrics(self):
         """Show performance and evaluation metrics."""
         print("🔄 PHASE 5: Performance Metrics")
@@ -216,11 +246,10 @@ class CapstoneDemo:
 
                 # Read and show summary of the latest report
                 try:
-                    with open(report_file) as f:
-                        lines = f.readlines()
-                        if len(lines) > 1:
-                            last_run = lines[-1].split(",")[0] if lines else "Unknown"
-                            print(f"     Last run: {last_run}")
+                    last_row = self._last_report_row(report_file)
+                    if last_row is not None:
+                        last_run = last_row.split(",", 1)[0]
+                        print(f"     Last run: {last_run}")
                 except Exception:
                     # Ignore errors reading report files
                     continue
@@ -228,14 +257,13 @@ class CapstoneDemo:
             print("📊 No evaluation reports found - run evaluations with 'make eval'")
 
         # Show system health
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.get(f"{self.base_url}/health")
-            if response.status_code == 200:
-                print(f"\n💚 System health: {response.json()['status']}")
+        response = await self.client.get("/health")
+        if response.status_code == 200:
+            print(f"\n💚 System health: {response.json()['status']}")
 
-            response = await client.get(f"{self.base_url}/ready")
-            if response.status_code == 200:
-                print(f"🟢 System ready: {response.json()['status']}")
+        response = await self.client.get("/ready")
+        if response.status_code == 200:
+            print(f"🟢 System ready: {response.json()['status']}")
 
         print()
 
@@ -253,11 +281,17 @@ class CapstoneDemo:
         print()
 
         try:
-            await self.demo_document_upload()
-            await self.demo_intelligent_chat()
-            await self.demo_citation_support()
-            await self.demo_session_management()
-            await self.demo_performance_metrics()
+            # One pooled client for every phase so connections are reused
+            async with httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=60.0,
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+            ) as self.client:
+                await self.demo_document_upload()
+                await self.demo_intelligent_chat()
+                await self.demo_citation_support()
+                await self.demo_session_management()
+                await self.demo_performance_metrics()
 
             print("🎉 DEMONSTRATION COMPLETE!")
             print("=" * 50)
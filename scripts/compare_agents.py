@@ -7,12 +7,14 @@ and compares their performance, response quality, and consistency.
 """
 
 import asyncio
-import json
 import time
+from collections.abc import Callable
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
+import orjson
+
 from app.agent_service import AgentService
 from app.pydantic_agent_service import PydanticAgentService
 
@@ -39,6 +41,9 @@ class AgentResult:
     structured_output: dict[str, Any] | None = None
 
 
+# Upper bound on test cases evaluated at the same time
+MAX_CONCURRENT_CASES = 4
+
 # Test cases covering different scenarios
 TEST_CASES = [
     TestCase(
@@ -74,13 +79,14 @@ TEST_CASES = [
 ]
 
 
-async def test_langgraph_agent(test_case: TestCase) -> AgentResult:
+async def test_langgraph_agent(agent: AgentService, test_case: TestCase) -> AgentResult:
     """Test the LangGraph-based agent."""
-    agent = AgentService()
-
     start_time = time.perf_counter()
     try:
-        response = await agent.answer(test_case.question, stream=False)
+        # Per-case session keeps the shared agent's memory isolated between cases
+        response = await agent.answer(
+            test_case.question, stream=False, session=f"compare_{test_case.category}"
+        )
         end_time = time.perf_counter()
 
         return AgentResult(
@@ -94,13 +100,13 @@ async def test_langgraph_agent(test_case: TestCase) -> AgentResult:
         return AgentResult(answer="", response_time=end_time - start_time, error=str(e))
 
 
-async def test_pydantic_agent(test_case: TestCase) -> AgentResult:
+async def test_pydantic_agent(agent: PydanticAgentService, test_case: TestCase) -> AgentResult:
     """Test the pydantic-ai based agent."""
-    agent = PydanticAgentService()
-
     start_time = time.perf_counter()
     try:
-        response = await agent.ask(test_case.question, stream=False)
+        response = await agent.ask(
+            test_case.question, session_id=f"compare_{test_case.category}", stream=False
+        )
         end_time = time.perf_counter()
 
         return AgentResult(
@@ -120,42 +126,92 @@ async def test_pydantic_agent(test_case: TestCase) -> AgentResult:
         return AgentResult(answer="", response_time=end_time - start_time, error=str(e))
 
 
+@dataclass(slots=True)
+class LangGraphSummary:
+    """Per-case metrics for the LangGraph agent."""
+
+    response_time: float
+    answer_length: int
+    has_error: bool
+    error: str | None
+
+
+@dataclass(slots=True)
+class PydanticSummary:
+    """Per-case metrics for the Pydantic-AI agent."""
+
+    response_time: float
+    answer_length: int
+    route_used: str | None
+    sources_count: int
+    has_error: bool
+    error: str | None
+    route_matches_expected: bool
+
+
+@dataclass(slots=True)
+class Comparison:
+    """Head-to-head comparison for a single case."""
+
+    speed_difference: float
+    pydantic_faster: bool
+    both_succeeded: bool
+
+
+@dataclass(slots=True)
+class CaseAnalysis:
+    """Analysis of both agents on a single test case."""
+
+    test_case: TestCase
+    langgraph: LangGraphSummary
+    pydantic_ai: PydanticSummary
+    comparison: Comparison
+
+
+class AgentPool:
+    """Fixed-size pool of pre-built agents handed out to concurrent cases."""
+
+    def __init__(self, factory: Callable[[], Any], size: int) -> None:
+        self._queue: asyncio.Queue[Any] = asyncio.Queue()
+        for _ in range(size):
+            self._queue.put_nowait(factory())
+
+    async def acquire(self) -> Any:
+        return await self._queue.get()
+
+    def release(self, agent: Any) -> None:
+        self._queue.put_nowait(agent)
+
+
 def analyze_results(
     test_case: TestCase,
     langgraph_result: AgentResult,
     pydantic_result: AgentResult,
-) -> dict:
+) -> CaseAnalysis:
     """Analyze and compare results from both agents."""
-    analysis = {
-        "test_case": {
-            "question": test_case.question,
-            "category": test_case.category,
-            "expected_route": test_case.expected_route,
-            "description": test_case.description,
-        },
-        "langgraph": {
-            "response_time": langgraph_result.response_time,
-            "answer_length": len(langgraph_result.answer),
-            "has_error": langgraph_result.error is not None,
-            "error": langgraph_result.error,
-        },
-        "pydantic_ai": {
-            "response_time": pydantic_result.response_time,
-            "answer_length": len(pydantic_result.answer),
-            "route_used": pydantic_result.route_used,
-            "sources_count": pydantic_result.sources_count,
-            "has_error": pydantic_result.error is not None,
-            "error": pydantic_result.error,
-            "route_matches_expected": pydantic_result.route_used == test_case.expected_route,
-        },
-        "comparison": {
-            "speed_difference": langgraph_result.response_time - pydantic_result.response_time,
-            "pydantic_faster": pydantic_result.response_time < langgraph_result.response_time,
-            "both_succeeded": langgraph_result.error is None and pydantic_result.error is None,
-        },
-    }
-
-    return analysis
+    return CaseAnalysis(
+        test_case=test_case,
+        langgraph=LangGraphSummary(
+            response_time=langgraph_result.response_time,
+            answer_length=len(langgraph_result.answer),
+            has_error=langgraph_result.error is not None,
+            error=langgraph_result.error,
+        ),
+        pydantic_ai=PydanticSummary(
+            response_time=pydantic_result.response_time,
+            answer_length=len(pydantic_result.answer),
+            route_used=pydantic_result.route_used,
+            sources_count=pydantic_result.sources_count,
+            has_error=pydantic_result.error is not None,
+            error=pydantic_result.error,
+            route_matches_expected=pydantic_result.route_used == test_case.expected_route,
+        ),
+        comparison=Comparison(
+            speed_difference=langgraph_result.response_time - pydantic_result.response_time,
+            pydantic_faster=pydantic_result.response_time < langgraph_result.response_time,
+            both_succeeded=langgraph_result.error is None and pydantic_result.error is None,
+        ),
+    )
 
 
 async def run_comparison():
@@ -163,30 +219,48 @@ async def run_comparison():
     print("🚀 Starting Agent Comparison: Pydantic-AI vs LangGraph")
     print("=" * 60)
 
-    results = []
-
-    for i, test_case in enumerate(TEST_CASES, 1):
+    # Build agents up front, one per concurrent slot, so response times measure
+    # steady state and no construction happens while cases are running
+    langgraph_pool = AgentPool(AgentService, MAX_CONCURRENT_CASES)
+    pydantic_pool = AgentPool(PydanticAgentService, MAX_CONCURRENT_CASES)
+
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_CASES)
+
+    async def run_one(test_case: TestCase) -> tuple[AgentResult, AgentResult]:
+        async with semaphore:
+            langgraph_agent = await langgraph_pool.acquire()
+            pydantic_agent = await pydantic_pool.acquire()
+            try:
+                # Keep the two agents serial within a case: their synchronous RAG and
+                # embedding work would otherwise land inside each other's timers
+                langgraph_result = await test_langgraph_agent(langgraph_agent, test_case)
+                pydantic_result = await test_pydantic_agent(pydantic_agent, test_case)
+                return langgraph_result, pydantic_result
+            finally:
+                langgraph_pool.release(langgraph_agent)
+                pydantic_pool.release(pydantic_agent)
+
+    print(f"🔍 Testing both agents on {len(TEST_CASES)} cases...")
+    case_results = await asyncio.gather(*(run_one(test_case) for test_case in TEST_CASES))
+
+    results: list[CaseAnalysis] = []
+
+    for i, (test_case, (langgraph_result, pydantic_result)) in enumerate(
+        zip(TEST_CASES, case_results, strict=True), 1
+    ):
         print(f"\n📝 Test {i}/{len(TEST_CASES)}: {test_case.category}")
         print(f"   Question: {test_case.question}")
         print(f"   Expected route: {test_case.expected_route}")
 
-        # Test LangGraph agent
-        print("   🔍 Testing LangGraph agent...")
-        langgraph_result = await test_langgraph_agent(test_case)
-
-        # Test Pydantic-AI agent
-        print("   🔍 Testing Pydantic-AI agent...")
-        pydantic_result = await test_pydantic_agent(test_case)
-
         # Analyze results
         analysis = analyze_results(test_case, langgraph_result, pydantic_result)
         results.append(analysis)
 
-        # Print immediate results
+        # Print per-case results
         print(f"   ⏱️  LangGraph: {langgraph_result.response_time:.2f}s")
         print(f"   ⏱️  Pydantic-AI: {pydantic_result.response_time:.2f}s")
         if pydantic_result.route_used:
-            route_icon = "✅" if analysis["pydantic_ai"]["route_matches_expected"] else "❌"
+            route_icon = "✅" if analysis.pydantic_ai.route_matches_expected else "❌"
             print(f"   🧭 Route: {pydantic_result.route_used} {route_icon}")
         if pydantic_result.sources_count > 0:
             print(f"   📚 Sources: {pydantic_result.sources_count}")
@@ -201,24 +275,23 @@ async def run_comparison():
     print("📊 COMPARISON SUMMARY")
     print("=" * 60)
 
-    successful_tests = [r for r in results if r["comparison"]["both_succeeded"]]
-    pydantic_faster_count = sum(1 for r in successful_tests if r["comparison"]["pydantic_faster"])
-    correct_routes = sum(1 for r in results if r["pydantic_ai"]["route_matches_expected"])
+    # Fold every summary aggregate into one pass over the results
+    successful_count = pydantic_faster_count = correct_routes = 0
+    langgraph_time_total = pydantic_time_total = 0.0
+    for r in results:
+        correct_routes += r.pydantic_ai.route_matches_expected
+        if r.comparison.both_succeeded:
+            successful_count += 1
+            pydantic_faster_count += r.comparison.pydantic_faster
+            langgraph_time_total += r.langgraph.response_time
+            pydantic_time_total += r.pydantic_ai.response_time
 
-    avg_langgraph_time = (
-        sum(r["langgraph"]["response_time"] for r in successful_tests) / len(successful_tests)
-        if successful_tests
-        else 0
-    )
-    avg_pydantic_time = (
-        sum(r["pydantic_ai"]["response_time"] for r in successful_tests) / len(successful_tests)
-        if successful_tests
-        else 0
-    )
+    avg_langgraph_time = langgraph_time_total / successful_count if successful_count else 0
+    avg_pydantic_time = pydantic_time_total / successful_count if successful_count else 0
 
     print(f"🧪 Total tests: {len(TEST_CASES)}")
-    print(f"✅ Both succeeded: {len(successful_tests)}")
-    print(f"⚡ Pydantic-AI faster: {pydantic_faster_count}/{len(successful_tests)}")
+    print(f"✅ Both succeeded: {successful_count}")
+    print(f"⚡ Pydantic-AI faster: {pydantic_faster_count}/{successful_count}")
     print(f"🎯 Correct routing: {correct_routes}/{len(TEST_CASES)}")
     print(f"⏱️  Avg LangGraph time: {avg_langgraph_time:.2f}s")
     print(f"⏱️  Avg Pydantic-AI time: {avg_pydantic_time:.2f}s")
@@ -231,23 +304,20 @@ async def run_comparison():
     output_path = Path("portfolio/agent_comparison_results.json")
     output_path.parent.mkdir(exist_ok=True)
 
-    with open(output_path, "w") as f:
-        json.dump(
-            {
-                "timestamp": time.time(),
-                "summary": {
-                    "total_tests": len(TEST_CASES),
-                    "successful_tests": len(successful_tests),
-                    "pydantic_faster_count": pydantic_faster_count,
-                    "correct_routes": correct_routes,
-                    "avg_langgraph_time": avg_langgraph_time,
-                    "avg_pydantic_time": avg_pydantic_time,
-                },
-                "detailed_results": results,
-            },
-            f,
-            indent=2,
-        )
+    # orjson serializes the (nested) result dataclasses natively
+    payload = {
+        "timestamp": time.time(),
+        "summary": {
+            "total_tests": len(TEST_CASES),
+            "successful_tests": successful_count,
+            "pydantic_faster_count": pydantic_faster_count,
+            "correct_routes": correct_routes,
+            "avg_langgraph_time": avg_langgraph_time,
+            "avg_pydantic_time": avg_pydantic_time,
+        },
+        "detailed_results": results,
+    }
+    output_path.write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
 
     print(f"💾 Detailed results saved to: {output_path}")
 
@@ -260,7 +330,7 @@ async def run_comparison():
     else:
         print("⚠️  Consider tuning Pydantic-AI routing logic")
 
-    if pydantic_faster_count / len(successful_tests) > 0.5:
+    if pydantic_faster_count / successful_count > 0.5:
         print("✅ Pydantic-AI shows good performance")
     else:
         print("⚠️  LangGraph may be faster in some cases")
@@ -0,0 +1,93 @@
+"""Helpers shared by the golden-set evaluation scripts."""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import re
+from collections.abc import Iterable
+from hashlib import blake2b
+from typing import Any
+
+import httpx
+import orjson
+
+JSON_HEADERS = {"content-type": "application/json"}
+RETRY_STATUSES = frozenset({502, 503, 504})
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.2
+
+
+def build_client(max_connections: int) -> httpx.AsyncClient:
+    """Pooled keep-alive client; the transport retries failed connects (HTTP/1.1, no h2 dep)."""
+    transport = httpx.AsyncHTTPTransport(
+        retries=3,
+        limits=httpx.Limits(
+            max_connections=max_connections, max_keepalive_connections=max_connections
+        ),
+    )
+    return httpx.AsyncClient(transport=transport, timeout=60.0)
+
+
+async def request_with_retries(
+    client: httpx.AsyncClient, method: str, url: str, **kwargs: Any
+) -> httpx.Response:
+    """Send a request, retrying gateway errors (502/503/504) with exponential backoff."""
+    attempt = 0
+    while True:
+        resp = await client.request(method, url, **kwargs)
+        if resp.status_code not in RETRY_STATUSES or attempt >= MAX_RETRIES:
+            return resp
+        await asyncio.sleep(BACKOFF_FACTOR * (2**attempt))
+        attempt += 1
+
+
+async def reload_corpus(
+    client: httpx.AsyncClient, base_url: str, docs: list[tuple[str, str]]
+) -> None:
+    """Upsert docs into the server's RAG corpus and wait for ingestion to finish."""
+    resp = await request_with_retries(
+        client,
+        "POST",
+        f"{base_url}/rag/reload",
+        params={"background": "false"},
+        content=orjson.dumps(docs),
+        headers=JSON_HEADERS,
+        timeout=30,
+    )
+    resp.raise_for_status()
+
+
+async def reload_corpora(
+    client: httpx.AsyncClient, base_url: str, cases: Iterable[dict[str, Any]]
+) -> int:
+    """Reload each distinct golden doc-set once, in case order; returns the number of reloads."""
+    seen: set[bytes] = set()
+    for case in cases:
+        docs = [(d[0], d[1]) for d in case["docs"]]
+        key = blake2b(orjson.dumps(docs), digest_size=16).digest()
+        if key in seen:
+            continue
+        seen.add(key)
+        await reload_corpus(client, base_url, docs)
+    return len(seen)
+
+
+@functools.lru_cache(maxsize=256)
+def token_pattern(tokens: tuple[str, ...]) -> re.Pattern[str]:
+    # Longest tokens first so the alternation prefers the most specific match
+    ordered = sorted(set(tokens), key=len, reverse=True)
+    return re.compile("|".join(re.escape(token) for token in ordered))
+
+
+def count_hits(answer: str, expected: list[str]) -> int:
+    """Count expected tokens present in the answer, case-insensitively, in one scan."""
+    if not expected:
+        return 0
+    answer_lc = answer.lower()
+    tokens = [token.lower() for token in expected]
+    found = set(token_pattern(tuple(tokens)).findall(answer_lc))
+    if found.issuperset(tokens):
+        return len(tokens)
+    # The scan does not report tokens nested inside a longer match (e.g. "py" in "python")
+    return sum(1 for token in tokens if token in found or token in answer_lc)
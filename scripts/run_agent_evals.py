@@ -2,20 +2,41 @@ from __future__ import annotations
 
 import asyncio
 import csv
-import json
+import hashlib
+import io
 import time
 from collections.abc import AsyncIterator, Iterable
 from dataclasses import dataclass
 from pathlib import Path
 
+import numpy as np
+import orjson
+
 from app.agent_memory import InMemoryAgentMemory
 from app.agent_service import AgentService
 from app.rag_service import RAGService
 from app.text_splitter import split_into_chunks
+from eval_common import count_hits
 
 DATA_PATH = Path("tests/golden/agent_golden.json")
 REPORT_PATH = Path("portfolio/agent_eval_report.csv")
 PORTFOLIO_DIR = REPORT_PATH.parent
+EMBED_CACHE_DIR = PORTFOLIO_DIR / ".embed_cache"
+MAX_CONCURRENT_CASES = 8
+# Chunking parameters are pinned here because they are part of the embed cache key
+CHUNK_SIZE = 800
+CHUNK_OVERLAP = 100
+REPORT_FIELDS = (
+    "name",
+    "question",
+    "preferred_route",
+    "observed_route",
+    "route_match",
+    "latency_ms",
+    "contains_score",
+    "answer_excerpt",
+    "contexts_used",
+)
 
 
 @dataclass
@@ -39,7 +60,9 @@ class AgentCase:
             web_direct_answer=(
                 str(raw["web_direct_answer"]) if raw.get("web_direct_answer") is not None else None
             ),
-            expected_contains=[str(item) for item in raw.get("expected_contains", [])],
+            expected_contains=[
+                str(item).strip().lower() for item in raw.get("expected_contains", [])
+            ],
         )
 
 
@@ -70,13 +93,53 @@ class FakeAIService:
         return gen()
 
 
+class ScopedRAG:
+    """View over a shared RAGService restricted to one case's ingested chunks."""
+
+    def __init__(self, rag: RAGService, source_id: str) -> None:
+        self._rag = rag
+        self._where = {"source_id": source_id}
+        # Most recent retrieve_with_sources result, i.e. what the agent's rag node used
+        self.last_sources: list[dict[str, object]] = []
+
+    def retrieve(self, query: str, k: int = 4, include_metadata: bool = False):
+        return self._rag.retrieve(query, k=k, include_metadata=include_metadata, where=self._where)
+
+    def retrieve_with_sources(self, query: str, k: int = 4) -> list[dict[str, object]]:
+        self.last_sources = self._rag.retrieve_with_sources(query, k=k, where=self._where)
+        return self.last_sources
+
+
+def _load_or_embed_chunks(rag: RAGService, text: str) -> tuple[list[str], list[list[float]]]:
+    """Chunk and embed a golden doc, reusing vectors cached on disk by earlier runs."""
+    cache_key = f"{rag.embedding_model}\0{CHUNK_SIZE}\0{CHUNK_OVERLAP}\0{text}"
+    digest = hashlib.sha256(cache_key.encode()).hexdigest()
+    chunks_path = EMBED_CACHE_DIR / f"{digest}.json"
+    vectors_path = EMBED_CACHE_DIR / f"{digest}.npy"
+    if chunks_path.exists() and vectors_path.exists():
+        chunks = orjson.loads(chunks_path.read_bytes())
+        return chunks, np.load(vectors_path).tolist()
+
+    chunks = split_into_chunks(text, chunk_size=CHUNK_SIZE, overlap=CHUNK_OVERLAP)
+    embeddings = rag.embed_texts(chunks)
+    EMBED_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    np.save(vectors_path, np.asarray(embeddings, dtype=np.float32))
+    chunks_path.write_bytes(orjson.dumps(chunks))
+    return chunks, embeddings
+
+
 def _ingest_docs_into_rag(rag: RAGService, case: AgentCase) -> None:
     if not case.docs:
         return
     payload = []
+    embeddings: list[list[float]] = []
+    # Identical docs within a case are chunked/embedded once and reused
+    loaded: dict[str, tuple[list[str], list[list[float]]]] = {}
     for idx, text in enumerate(case.docs):
         base_id = f"{case.name}::doc{idx}"
-        chunks = split_into_chunks(text)
+        if text not in loaded:
+            loaded[text] = _load_or_embed_chunks(rag, text)
+        chunks, vectors = loaded[text]
         for chunk_index, chunk_text in enumerate(chunks):
             payload.append(
                 (
@@ -85,12 +148,12 @@ def _ingest_docs_into_rag(rag: RAGService, case: AgentCase) -> None:
                     {"source_id": case.name, "chunk_index": chunk_index, "doc_index": idx},
                 )
             )
-    rag.ingest(payload)
+        embeddings.extend(vectors)
+    rag.ingest_precomputed(payload, embeddings)
 
 
-async def run_case(case: AgentCase) -> dict[str, object]:
-    rag = RAGService(persist_path=None)
-    _ingest_docs_into_rag(rag, case)
+async def run_case(case: AgentCase, shared_rag: RAGService) -> dict[str, object]:
+    rag = ScopedRAG(shared_rag, case.name)
     web = (
         FakeWeb(case.web_snippets, case.web_direct_answer)
         if case.preferred_route == "web"
@@ -103,33 +166,31 @@ async def run_case(case: AgentCase) -> dict[str, object]:
     start = time.perf_counter()
     stream = await agent.answer(case.question, stream=True, session=case.name)
 
-    breadcrumbs: list[str] = []
-    answer_parts: list[str] = []
+    answer_buf = io.StringIO()
+    observed_route = "unknown"
     async for chunk in stream:  # type: ignore[assignment]
         for line in chunk.splitlines():
             stripped = line.strip()
             if not stripped:
                 continue
             if stripped.startswith("["):
-                breadcrumbs.append(stripped)
+                # Breadcrumb; only the first [route] line matters
+                if observed_route == "unknown" and stripped.startswith("[route]"):
+                    tokens = stripped.split(maxsplit=2)
+                    if len(tokens) > 1:
+                        observed_route = tokens[1].lower()
             else:
-                answer_parts.append(stripped)
+                answer_buf.write(stripped)
+                answer_buf.write(" ")
     duration_ms = (time.perf_counter() - start) * 1000
 
-    route_line = next((line for line in breadcrumbs if line.startswith("[route]")), "")
-    observed_route = "unknown"
-    if route_line:
-        tokens = route_line.split()
-        if len(tokens) > 1:
-            observed_route = tokens[1].lower()
-
-    answer_text = " ".join(answer_parts).strip()
+    answer_text = answer_buf.getvalue().strip()
     score = contains_score(answer_text, case.expected_contains)
 
+    # Report the contexts the agent actually retrieved instead of re-running the search
     contexts_meta = []
     if observed_route == "rag":
-        retrieved = rag.retrieve(case.question, include_metadata=True)
-        contexts_meta = [meta for _, meta in retrieved]
+        contexts_meta = [source["metadata"] for source in rag.last_sources]
 
     return {
         "name": case.name,
@@ -148,41 +209,41 @@ async def run_case(case: AgentCase) -> dict[str, object]:
 
 
 def contains_score(answer: str, expected_tokens: list[str]) -> float:
+    """Fraction of expected tokens found in the answer."""
     if not expected_tokens:
         return 1.0
-    normalized_answer = answer.lower()
-    hits = sum(1 for token in expected_tokens if token.lower() in normalized_answer)
-    return hits / len(expected_tokens)
+    return count_hits(answer, expected_tokens) / len(expected_tokens)
 
 
 async def main() -> None:
     if not DATA_PATH.exists():
         raise SystemExit(f"Golden file not found: {DATA_PATH}")
 
-    data = json.loads(DATA_PATH.read_text())
+    data = orjson.loads(DATA_PATH.read_bytes())
     cases = [AgentCase.from_dict(item) for item in data]
 
-    results: list[dict[str, object]] = []
+    # One RAG index for the whole suite; each case only sees its own chunks via source_id
+    shared_rag = RAGService(persist_path=None)
+    # Ingest up front: chunking/embedding is blocking and would otherwise run inside
+    # other cases' latency windows once they are gathered
     for case in cases:
-        result = await run_case(case)
-        results.append(result)
+        _ingest_docs_into_rag(shared_rag, case)
+
+    # Cases share no other state, so run them concurrently (bounded); gather keeps input order
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_CASES)
+
+    async def _run(case: AgentCase) -> dict[str, object]:
+        async with semaphore:
+            return await run_case(case, shared_rag)
+
+    results: list[dict[str, object]] = await asyncio.gather(*(_run(case) for case in cases))
 
     PORTFOLIO_DIR.mkdir(parents=True, exist_ok=True)
+    rows = [tuple(result[field] for field in REPORT_FIELDS) for result in results]
     with REPORT_PATH.open("w", newline="") as csvfile:
-        fieldnames = [
-            "name",
-            "question",
-            "preferred_route",
-            "observed_route",
-            "route_match",
-            "latency_ms",
-            "contains_score",
-            "answer_excerpt",
-            "contexts_used",
-        ]
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(results)
+        writer = csv.writer(csvfile)
+        writer.writerow(REPORT_FIELDS)
+        writer.writerows(rows)
 
     route_accuracy = sum(1 for item in results if item["route_match"] == "yes") / len(results)
     avg_score = sum(float(item["contains_score"]) for item in results) / len(results)
@@ -1,16 +1,22 @@
 from __future__ import annotations
 
 import argparse
-import json
+import asyncio
 import os
 from pathlib import Path
 from typing import Any
 
-import requests
+import httpx
+import orjson
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 from datasets import Dataset
 from ragas import evaluate
 from ragas.metrics import answer_relevancy, context_precision, context_recall
 
+from eval_common import build_client, reload_corpora, request_with_retries
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Run RAGAS metrics against the API.")
@@ -19,11 +25,60 @@ def parse_args() -> argparse.Namespace:
         default=os.getenv("API_BASE_URL", "http://127.0.0.1:8000"),
         help="Base URL for the API (can also be set via API_BASE_URL).",
     )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=None,
+        help="Number of golden cases to run concurrently (default: min(8, number of cases)).",
+    )
     return parser.parse_args()
 
 
 def load_golden(path: Path) -> list[dict[str, Any]]:
-    return json.loads(path.read_text())
+    return orjson.loads(path.read_bytes())
+
+
+async def fetch_record(
+    client: httpx.AsyncClient, sem: asyncio.Semaphore, base_url: str, case: dict[str, Any]
+) -> dict[str, Any]:
+    question = case["question"]
+    reference = ", ".join(case["expected_contains"])  # simplistic reference text
+
+    async with sem:
+        # ask and collect answer + contexts
+        resp = await request_with_retries(client, "GET", f"{base_url}/ask", params={"q": question})
+    resp.raise_for_status()
+    payload = orjson.loads(resp.content)
+    answer = payload.get("answer", "")
+    contexts = payload.get("contexts", [])
+
+    return {
+        "question": question,
+        "contexts": contexts,
+        "answer": answer,
+        "ground_truth": reference,
+    }
+
+
+async def collect_records(
+    base_url: str, golden: list[dict[str, Any]], max_workers: int
+) -> list[dict[str, Any]]:
+    sem = asyncio.Semaphore(max_workers)
+    async with build_client(max_workers) as client:
+        # /rag/reload only upserts into one server-side corpus, so load every case's docs
+        # before any /ask runs; concurrent asks then all see the same, complete corpus
+        await reload_corpora(client, base_url, golden)
+        return await asyncio.gather(*(fetch_record(client, sem, base_url, c) for c in golden))
+
+
+def write_report_csv(df: pd.DataFrame, out_path: Path) -> None:
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # The Arrow CSV writer has no list support; render nested columns (e.g. contexts)
+    # the way DataFrame.to_csv does
+    for i, field in enumerate(table.schema):
+        if pa.types.is_nested(field.type):
+            table = table.set_column(i, field.name, pa.array(df[field.name].map(str)))
+    pacsv.write_csv(table, out_path)
 
 
 def main() -> None:
@@ -31,31 +86,9 @@ def main() -> None:
     base_url = args.base_url.rstrip("/")
     golden = load_golden(Path("tests/golden/golden.json"))
     # Use expected tokens joined as the reference for a toy baseline; answers come from /ask
-    records: list[dict[str, Any]] = []
-    for case in golden:
-        question = case["question"]
-        docs = [(d[0], d[1]) for d in case["docs"]]
-        reference = ", ".join(case["expected_contains"])  # simplistic reference text
-
-        # reload corpus per case
-        resp = requests.post(f"{base_url}/rag/reload", json=docs, timeout=30)
-        resp.raise_for_status()
-
-        # ask and collect answer + contexts
-        resp = requests.get(f"{base_url}/ask", params={"q": question}, timeout=60)
-        resp.raise_for_status()
-        payload = resp.json()
-        answer = payload.get("answer", "")
-        contexts = payload.get("contexts", [])
-
-        records.append(
-            {
-                "question": question,
-                "contexts": contexts,
-                "answer": answer,
-                "ground_truth": reference,
-            }
-        )
+    max_workers = args.max_workers or min(8, max(1, len(golden)))
+    # ragas drives its own event loop, so only the HTTP collection runs under asyncio.run
+    records = asyncio.run(collect_records(base_url, golden, max_workers))
 
     ds = Dataset.from_list(records)
     result = evaluate(ds, metrics=[answer_relevancy, context_precision, context_recall])
@@ -63,7 +96,7 @@ def main() -> None:
     out = Path("portfolio")
     out.mkdir(exist_ok=True)
     out_path = out / "ragas_report.csv"
-    df.to_csv(out_path, index=False)
+    write_report_csv(df, out_path)
     print(f"Wrote {out_path}")
 
 
@@ -1,14 +1,20 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
 import csv
-import json
 import os
 import time
 from pathlib import Path
 from typing import Any
 
-import requests
+import httpx
+import orjson
+
+from eval_common import build_client, count_hits, request_with_retries
+
+REPORT_FIELDS = ("name", "latency_ms", "hits", "out_of", "score")
+ReportRow = tuple[str, float, int, int, float]
 
 
 def parse_args() -> argparse.Namespace:
@@ -18,53 +24,62 @@ def parse_args() -> argparse.Namespace:
         default=os.getenv("API_BASE_URL", "http://127.0.0.1:8000"),
         help="Base URL for the API (can also be set via API_BASE_URL).",
     )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=None,
+        help="Number of golden cases to run concurrently (default: min(8, number of cases)).",
+    )
     return parser.parse_args()
 
 
 def load_golden(path: Path) -> list[dict[str, Any]]:
-    return json.loads(path.read_text())
+    return orjson.loads(path.read_bytes())
 
 
-def main() -> None:
+async def run_case(
+    client: httpx.AsyncClient, sem: asyncio.Semaphore, base_url: str, case: dict[str, Any]
+) -> ReportRow:
+    name = case["name"]
+    q = case["question"]
+    expected = case["expected_contains"]
+
+    async with sem:
+        t0 = time.perf_counter()
+        resp = await request_with_retries(client, "GET", f"{base_url}/agent/chat", params={"q": q})
+        dt_ms = (time.perf_counter() - t0) * 1000
+    resp.raise_for_status()
+    payload = orjson.loads(resp.content)
+    answer = payload.get("answer", "")
+
+    hits = count_hits(answer, expected)
+    score = hits / max(1, len(expected))
+    return (name, round(dt_ms, 2), hits, len(expected), round(score, 3))
+
+
+async def main() -> None:
     args = parse_args()
     base_url = args.base_url.rstrip("/")
     golden_path = Path("tests/golden/web_golden.json")
     data = load_golden(golden_path)
-    report_rows: list[dict[str, Any]] = []
 
-    for case in data:
-        name = case["name"]
-        q = case["question"]
-        expected = case["expected_contains"]
-
-        t0 = time.perf_counter()
-        resp = requests.get(f"{base_url}/agent/chat", params={"q": q}, timeout=60)
-        dt_ms = (time.perf_counter() - t0) * 1000
-        resp.raise_for_status()
-        payload = resp.json()
-        answer = payload.get("answer", "")
-
-        hits = sum(1 for token in expected if token.lower() in answer.lower())
-        score = hits / max(1, len(expected))
-        report_rows.append(
-            {
-                "name": name,
-                "latency_ms": round(dt_ms, 2),
-                "hits": hits,
-                "out_of": len(expected),
-                "score": round(score, 3),
-            }
+    # Each /agent/chat call is slow and independent, so run cases concurrently
+    max_workers = args.max_workers or min(8, max(1, len(data)))
+    sem = asyncio.Semaphore(max_workers)
+    async with build_client(max_workers) as client:
+        report_rows = await asyncio.gather(
+            *(run_case(client, sem, base_url, case) for case in data)
         )
 
     out = Path("portfolio")
     out.mkdir(exist_ok=True)
     csv_path = out / "web_eval_report.csv"
-    with csv_path.open("w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=["name", "latency_ms", "hits", "out_of", "score"])
-        writer.writeheader()
+    with csv_path.open("w", newline="", buffering=1 << 20) as f:
+        writer = csv.writer(f)
+        writer.writerow(REPORT_FIELDS)
         writer.writerows(report_rows)
     print(f"Wrote {csv_path} with {len(report_rows)} rows.")
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -1,22 +1,22 @@
 from __future__ import annotations
 
-import json
 from collections import defaultdict, deque
-from collections.abc import Iterable
+from collections.abc import Iterable, Sequence
 from typing import Protocol
 
+import orjson
 from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
 
+# Keyed by lowercase langchain message type; records are normalized on write
 MessageFactories = {
     "human": HumanMessage,
     "ai": AIMessage,
-    "assistant": AIMessage,
     "system": SystemMessage,
 }
 
 
 class AgentMemory(Protocol):
-    async def read(self, session_id: str) -> list[BaseMessage]:
+    async def read(self, session_id: str) -> Sequence[BaseMessage]:
         """Return the stored messages for a session (oldest → newest)."""
 
     async def append(self, session_id: str, messages: Iterable[BaseMessage]) -> None:
@@ -26,16 +26,14 @@ class AgentMemory(Protocol):
         """Clear stored messages for a session."""
 
 
-def _message_to_dict(message: BaseMessage) -> dict[str, str]:
-    return {
-        "type": getattr(message, "type", "human"),
-        "content": message.content if isinstance(message.content, str) else str(message.content),
-    }
+def _message_to_record(message: BaseMessage) -> tuple[str, str]:
+    # Stored as a compact [type, content] pair rather than a keyed object
+    content = message.content if isinstance(message.content, str) else str(message.content)
+    return getattr(message, "type", "human").lower(), content
 
 
-def _message_from_dict(payload: dict[str, str]) -> BaseMessage:
-    msg_type = payload.get("type", "human").lower()
-    content = payload.get("content", "")
+def _message_from_record(record: list[str]) -> BaseMessage:
+    msg_type, content = record
     factory = MessageFactories.get(msg_type, AIMessage)
     return factory(content=content)
 
@@ -48,8 +46,10 @@ class InMemoryAgentMemory:
             lambda: deque(maxlen=max(1, max_turns * 2))
         )
 
-    async def read(self, session_id: str) -> list[BaseMessage]:
-        return list(self._store[session_id])
+    async def read(self, session_id: str) -> tuple[BaseMessage, ...]:
+        # Immutable snapshot; .get avoids materializing an empty deque for unknown sessions
+        record = self._store.get(session_id)
+        return tuple(record) if record else ()
 
     async def append(self, session_id: str, messages: Iterable[BaseMessage]) -> None:
         record = self._store[session_id]
@@ -80,34 +80,45 @@ class RedisAgentMemory:
                 "'pip install redis>=5'."
             ) from exc
 
-        self._client = redis_async.from_url(url, encoding="utf-8", decode_responses=True)
+        # Raw bytes in and out: orjson reads and writes UTF-8 bytes directly
+        self._client = redis_async.from_url(url, decode_responses=False)
         self._max_messages = max(1, max_turns * 2)
         self._ttl_seconds = ttl_seconds
         self._prefix = prefix.rstrip(":")
 
     def _key(self, session_id: str) -> str:
-        return f"{self._prefix}:{session_id}"
+        # Messages live in a Redis list (one JSON entry per message); the ":messages" suffix
+        # keeps it apart from keys written by the older single-JSON-blob layout
+        return f"{self._prefix}:{session_id}:messages"
 
     async def read(self, session_id: str) -> list[BaseMessage]:
-        raw = await self._client.get(self._key(session_id))
-        if not raw:
-            return []
-        try:
-            data = json.loads(raw)
-        except json.JSONDecodeError:
-            await self.clear(session_id)
-            return []
-        return [_message_from_dict(item) for item in data if isinstance(item, dict)]
+        raw_items = await self._client.lrange(self._key(session_id), 0, -1)
+        messages: list[BaseMessage] = []
+        for raw in raw_items:
+            try:
+                item = orjson.loads(raw)
+            except orjson.JSONDecodeError:
+                continue
+            if (
+                isinstance(item, list)
+                and len(item) == 2
+                and isinstance(item[0], str)
+                and isinstance(item[1], str)
+            ):
+                messages.append(_message_from_record(item))
+        return messages
 
     async def append(self, session_id: str, messages: Iterable[BaseMessage]) -> None:
-        stored = await self.read(session_id)
-        stored.extend(messages)
-        trimmed = stored[-self._max_messages :]
-        payload = json.dumps([_message_to_dict(msg) for msg in trimmed])
-        if self._ttl_seconds is None:
-            await self._client.set(self._key(session_id), payload)
-        else:
-            await self._client.set(self._key(session_id), payload, ex=self._ttl_seconds)
+        entries = [orjson.dumps(_message_to_record(msg)) for msg in messages]
+        if not entries:
+            return
+        key = self._key(session_id)
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.rpush(key, *entries)
+            pipe.ltrim(key, -self._max_messages, -1)
+            if self._ttl_seconds is not None:
+                pipe.expire(key, self._ttl_seconds)
+            await pipe.execute()
 
     async def clear(self, session_id: str) -> None:
         await self._client.delete(self._key(session_id))
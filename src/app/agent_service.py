@@ -1,16 +1,24 @@
 from __future__ import annotations
 
-from collections.abc import AsyncGenerator, AsyncIterator
+import functools
+import re
+from collections.abc import AsyncGenerator, AsyncIterator, Sequence
 from typing import Literal, TypedDict
 
 from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import END, StateGraph
+from langgraph.types import Command
 
 from app.agent_memory import AgentMemory, InMemoryAgentMemory
 from app.ai_service import AIService
 from app.rag_service import RAGService
 from app.web_search import TavilySearch
 
+_WEB_KEYWORDS = frozenset({"web", "latest", "news", "today", "current", "recent", "update"})
+_WORD_RE = re.compile(r"\w+")
+_NODE_NAMES = ["route", "rag", "web"]
+
 
 class AgentState(TypedDict, total=False):
     question: str
@@ -23,6 +31,76 @@ class AgentState(TypedDict, total=False):
     direct_answer: str | None
 
 
+def _service(config: RunnableConfig) -> AgentService:
+    return config["configurable"]["service"]
+
+
+async def _route_node(state: AgentState, config: RunnableConfig) -> Command:
+    question = state["question"]
+    history = state.get("messages", [])[:-1]
+    # _route_question only picks "web" when the service has a search client
+    decision, reason = _service(config)._route_question(question, history)
+    log = state.get("log", [])
+    entry = f"[route] {decision.upper()} — {reason}"
+    return Command(
+        goto=decision,
+        update={
+            "route": decision,
+            "route_reason": reason,
+            "log": log + [entry],
+        },
+    )
+
+
+async def _rag_node(state: AgentState, config: RunnableConfig) -> AgentState:
+    question = state["question"]
+    # Use enhanced retrieval with sources
+    enriched_results = _service(config).rag.retrieve_with_sources(question)
+    contexts = [result["content"] for result in enriched_results]
+    sources = enriched_results
+    log = state.get("log", [])
+    entry = f"[rag] Retrieved {len(contexts)} context chunk(s) from internal documents."
+    return {
+        "contexts": contexts,
+        "sources": sources,
+        "log": log + [entry],
+    }
+
+
+async def _web_node(state: AgentState, config: RunnableConfig) -> AgentState:
+    # Only compiled into graphs for services that have a web search client
+    web = _service(config).web
+    question = state["question"]
+    log = state.get("log", [])
+    snippets, direct = await web.search_with_answer(question)
+    snippets = [s for s in snippets if s]
+    entry = f"[web] Retrieved {len(snippets)} snippet(s) from Tavily."
+    return {
+        "contexts": snippets,
+        "direct_answer": direct,
+        "log": log + [entry],
+    }
+
+
+@functools.lru_cache(maxsize=2)
+def _compiled_graph(with_web: bool = True):
+    """Compile the agent graph once per process; nodes find their service via the run config.
+
+    Without web search there is no "web" node at all, so routing always lands on RAG.
+    """
+    workflow = StateGraph(AgentState)
+    # "route" hands off with Command(goto=...) rather than a conditional edge callback
+    destinations = ("rag", "web") if with_web else ("rag",)
+    workflow.add_node("route", _route_node, destinations=destinations)
+    workflow.add_node("rag", _rag_node)
+    workflow.set_entry_point("route")
+    if with_web:
+        workflow.add_node("web", _web_node)
+        workflow.add_edge("web", END)
+    workflow.add_edge("rag", END)
+    return workflow.compile()
+
+
 class AgentService:
     def __init__(
         self,
@@ -43,73 +121,25 @@ class AgentService:
                 self.web = None
         self.max_turns = memory_turns
         self.memory = memory or InMemoryAgentMemory(max_turns=self.max_turns)
-        self.graph = self._build_graph()
-
-    def _build_graph(self):
-        workflow = StateGraph(AgentState)
-
-        async def route_node(state: AgentState) -> AgentState:
-            question = state["question"]
-            history = state.get("messages", [])[:-1]
-            decision, reason = self._route_question(question, history)
-            log = state.get("log", [])
-            entry = f"[route] {decision.upper()} — {reason}"
-            return {
-                "route": decision,
-                "route_reason": reason,
-                "log": log + [entry],
-            }
-
-        async def rag_node(state: AgentState) -> AgentState:
-            question = state["question"]
-            # Use enhanced retrieval with sources
-            enriched_results = self.rag.retrieve_with_sources(question)
-            contexts = [result["content"] for result in enriched_results]
-            sources = enriched_results
-            log = state.get("log", [])
-            entry = f"[rag] Retrieved {len(contexts)} context chunk(s) from internal documents."
-            return {
-                "contexts": contexts,
-                "sources": sources,
-                "log": log + [entry],
-            }
-
-        async def web_node(state: AgentState) -> AgentState:
-            question = state["question"]
-            log = state.get("log", [])
-            if self.web is None:
-                fallback = [c for c in self.rag.retrieve(question) if c]
-                entry = "[web] Web search disabled; falling back to RAG contexts."
-                return {"contexts": fallback, "log": log + [entry]}
-            snippets, direct = await self.web.search_with_answer(question)
-            snippets = [s for s in snippets if s]
-            entry = f"[web] Retrieved {len(snippets)} snippet(s) from Tavily."
-            return {
-                "contexts": snippets,
-                "direct_answer": direct,
-                "log": log + [entry],
-            }
-
-        workflow.add_node("route", route_node)
-        workflow.add_node("rag", rag_node)
-        workflow.add_node("web", web_node)
-        workflow.set_entry_point("route")
-
-        def choose_next(state: AgentState) -> str:
-            return state.get("route", "rag")
-
-        workflow.add_conditional_edges("route", choose_next, {"rag": "rag", "web": "web"})
-        workflow.add_edge("rag", END)
-        workflow.add_edge("web", END)
+        self.graph = _compiled_graph(with_web=self.web is not None)
 
-        return workflow.compile()
+    def graph_config(self, session_key: str) -> RunnableConfig:
+        """Config for running the shared graph on behalf of this service instance."""
+        return {"configurable": {"thread_id": session_key, "service": self}}
 
     def _route_question(
-        self, question: str, history: list[BaseMessage]
+        self, question: str, history: Sequence[BaseMessage]
     ) -> tuple[Literal["rag", "web"], str]:
         lowered = question.lower()
-        web_keywords = ["web", "latest", "news", "today", "current", "recent", "update"]
-        prefer_web = any(keyword in lowered for keyword in web_keywords) or "http" in lowered
+        # Whole-word match so e.g. "webhook" or "currently" do not trigger web routing
+        tokens = set(_WORD_RE.findall(lowered))
+        prefer_web = not _WEB_KEYWORDS.isdisjoint(tokens) or "http" in lowered
+
+        # Both of these decide the route on their own, so skip the internal-docs probe
+        if self.web is None:
+            return "rag", "Web search unavailable; using local knowledge base"
+        if prefer_web:
+            return "web", "Detected recency/web intent"
 
         # Check if we have relevant internal documents first
         try:
@@ -120,15 +150,9 @@ class AgentService:
         except Exception:
             has_good_internal_match = False
 
-        if self.web is None:
-            return "rag", "Web search unavailable; using local knowledge base"
-
-        # Prefer internal docs if we have good matches, unless explicitly asking for web
-        if has_good_internal_match and not prefer_web:
+        if has_good_internal_match:
             return "rag", "Found relevant internal documents"
 
-        if prefer_web:
-            return "web", "Detected recency/web intent"
         if any(isinstance(msg, AIMessage) and "web" in msg.content.lower() for msg in history[-4:]):
             return "web", "Maintaining prior turn web context"
 
@@ -151,30 +175,31 @@ class AgentService:
         history = await self.memory.read(session_key)
         state: AgentState = {
             "question": question,
-            "messages": history + [HumanMessage(content=question)],
+            "messages": [*history, HumanMessage(content=question)],
             "log": [],
         }
-        config = {"configurable": {"thread_id": session_key}}
+        config = self.graph_config(session_key)
         if stream:
 
             async def gen() -> AsyncGenerator[str, None]:
                 combined: AgentState = {"log": []}
-                last_log_len = 0
-                async for event in self.graph.astream(state, config=config):
-                    for node_state in event.values():
-                        if not isinstance(node_state, dict):
-                            continue
-                        if "log" in node_state:
-                            log = node_state["log"]
-                            new_entries = log[last_log_len:]
-                            for entry in new_entries:
-                                yield f"{entry}\n"
-                            last_log_len = len(log)
-                            combined["log"] = log
-                        for key, value in node_state.items():
-                            if key == "log":
-                                continue
-                            combined[key] = value
+                # Only node completions matter; filtering here keeps langgraph from handing
+                # every internal chain/edge event to Python
+                async for event in self.graph.astream_events(
+                    state, config=config, version="v2", include_names=_NODE_NAMES
+                ):
+                    if event["event"] != "on_chain_end":
+                        continue
+                    node_state = event["data"].get("output")
+                    if isinstance(node_state, Command):
+                        node_state = node_state.update
+                    if not isinstance(node_state, dict):
+                        continue
+                    # Each node appends exactly one breadcrumb to the log it was given
+                    log = node_state.get("log")
+                    if log:
+                        yield f"{log[-1]}\n"
+                    combined.update(node_state)
 
                 contexts = combined.get("contexts", []) or []
                 direct = combined.get("direct_answer")
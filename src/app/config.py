@@ -5,6 +5,34 @@ import functools
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+class VectorDBSettings(BaseSettings):
+    """Provider credentials only the external vector adapters read; built on first use."""
+
+    # Same env names as before the split; schema build is deferred to first instantiation
+    model_config = SettingsConfigDict(
+        env_file=(".env",), env_prefix="", extra="ignore", defer_build=True
+    )
+
+    # Vertex AI Configuration
+    gcp_project_id: str | None = None
+    gcp_region: str = "us-central1"
+    vertex_index_endpoint_id: str | None = None
+
+    # Snowflake Configuration
+    snowflake_account: str | None = None
+    snowflake_user: str | None = None
+    snowflake_password: str | None = None
+    snowflake_database: str | None = None
+    snowflake_schema: str = "PUBLIC"
+
+    # CockroachDB Configuration (Bonus points! 🎯)
+    cockroach_connection_string: str | None = None
+
+    # LightLLM Integration
+    lightllm_endpoint: str | None = None
+    lightllm_enabled: bool = False
+
+
 class AppSettings(BaseSettings):
     model_config = SettingsConfigDict(env_file=(".env",), env_prefix="", extra="ignore")
 
@@ -36,6 +64,12 @@ class AppSettings(BaseSettings):
     # PostgreSQL for metadata and sessions
     postgres_url: str | None = None
     postgres_database: str = "py_ai_metadata"
+    # Per worker process: N workers open up to N x max_size connections (plus half as many
+    # for the metrics/log pool), so size it against the database's max_connections
+    postgres_pool_min_size: int = 2
+    postgres_pool_max_size: int = 10
+    # Buffer session counter increments in Redis (redis_url) and write them back in batches
+    postgres_session_counters_in_redis: bool = False
 
     # Redis for caching and Celery
     redis_url: str | None = None
@@ -43,25 +77,6 @@ class AppSettings(BaseSettings):
     # Vector Database Configuration
     vector_db_type: str = "chroma"  # "vertex", "snowflake", "mongodb_vector", "cockroach", "chroma"
 
-    # Vertex AI Configuration
-    gcp_project_id: str | None = None
-    gcp_region: str = "us-central1"
-    vertex_index_endpoint_id: str | None = None
-
-    # Snowflake Configuration
-    snowflake_account: str | None = None
-    snowflake_user: str | None = None
-    snowflake_password: str | None = None
-    snowflake_database: str | None = None
-    snowflake_schema: str = "PUBLIC"
-
-    # CockroachDB Configuration (Bonus points! 🎯)
-    cockroach_connection_string: str | None = None
-
-    # LightLLM Integration
-    lightllm_endpoint: str | None = None
-    lightllm_enabled: bool = False
-
     # Agent Configuration
     agent_memory_max_turns: int = 3
     agent_memory_ttl_seconds: int | None = 86_400
@@ -91,7 +106,16 @@ class AppSettings(BaseSettings):
     enable_plugins: bool = False
     plugin_directory: str = "plugins"
 
+    @functools.cached_property
+    def vector_db(self) -> VectorDBSettings:
+        return VectorDBSettings()
+
 
-@functools.lru_cache(maxsize=1)
+@functools.cache
 def get_settings() -> AppSettings:
     return AppSettings()
+
+
+# Build the settings at import (preload) time so .env parsing and validation never land on
+# the first request; get_settings.cache_clear() still forces a re-read from the environment.
+get_settings()
@@ -2,12 +2,15 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
-from datetime import datetime
+from datetime import UTC, datetime
 from typing import Any
 
+from cachetools import TTLCache
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from pydantic import BaseModel
+from pymongo import IndexModel, WriteConcern
 
 from app.config import get_settings
 
@@ -40,8 +43,87 @@ class StoredDocument(BaseModel):
     updated_at: datetime
 
 
+class StoredDocumentSummary(BaseModel):
+    """Stored document without its content, for listings."""
+
+    id: str
+    metadata: DocumentMetadata
+    chunks: list[dict] = []
+    created_at: datetime
+    updated_at: datetime
+
+
+def _filter_tags(mongo_query: dict[str, Any], value: Any) -> None:
+    mongo_query["metadata.tags"] = {"$in": value if isinstance(value, list) else [value]}
+
+
+def _filter_date_range(mongo_query: dict[str, Any], value: dict[str, Any]) -> None:
+    date_query = {}
+    if "start" in value:
+        date_query["$gte"] = value["start"]
+    if "end" in value:
+        date_query["$lte"] = value["end"]
+    if date_query:
+        mongo_query["metadata.upload_date"] = date_query
+
+
+# search_documents filter keys that map straight onto a metadata field
+_FILTER_FIELDS = {
+    "file_type": "metadata.file_type",
+    "processing_status": "metadata.processing_status",
+    "vector_status": "metadata.vector_status",
+    "user_id": "metadata.user_id",
+    "session_id": "metadata.session_id",
+}
+
+# Filter keys that need their value reshaped into a query operator
+_SPECIAL_FILTERS = {
+    "tags": _filter_tags,
+    "date_range": _filter_date_range,
+}
+
+
+# Write concern for status updates whose result the caller does not wait on
+_UNACKNOWLEDGED = WriteConcern(w=0)
+
+# Sort specs for search_documents: relevance for text search, otherwise newest first
+_SORT_BY_SCORE = [("score", {"$meta": "textScore"})]
+_SORT_BY_DATE = [("metadata.upload_date", -1)]
+
+
+def _stored_document(doc_data: dict[str, Any]) -> StoredDocument:
+    """Build a StoredDocument from a record this adapter wrote, skipping re-validation."""
+    metadata = DocumentMetadata.model_construct(**doc_data["metadata"])
+    return StoredDocument.model_construct(**{**doc_data, "metadata": metadata})
+
+
+def _document_summary(doc_data: dict[str, Any]) -> StoredDocumentSummary:
+    """Build a StoredDocumentSummary from a record fetched without its content."""
+    metadata = DocumentMetadata.model_construct(**doc_data["metadata"])
+    return StoredDocumentSummary.model_construct(**{**doc_data, "metadata": metadata})
+
+
 class MongoDBAdapter:
-    """MongoDB adapter for document storage and management."""
+    """MongoDB adapter for document storage and management.
+
+    ``connect()`` must be awaited before any CRUD call; the app does this once in its lifespan
+    startup via ``get_mongodb_adapter()``.
+    """
+
+    # (connection string, collection) pairs whose indexes were all created in this process;
+    # reconnecting to one of them skips the create_index round-trips
+    _indexes_ensured: set[tuple[str | None, str]] = set()
+
+    _INDEX_MODELS = [
+        IndexModel([("metadata.upload_date", -1)]),  # Sort by upload date
+        IndexModel([("metadata.processing_status", 1)]),  # Filter by status
+        IndexModel([("metadata.vector_status", 1)]),  # Filter by vector status
+        IndexModel([("metadata.user_id", 1)]),  # Filter by user
+        IndexModel([("metadata.session_id", 1)]),  # Filter by session
+        IndexModel([("metadata.tags", 1)]),  # Filter by tags
+        IndexModel([("metadata.file_type", 1)]),  # Filter by file type
+        IndexModel([("content", "text")]),  # Text search index
+    ]
 
     def __init__(self, connection_string: str = None):
         settings = get_settings()
@@ -49,6 +131,8 @@ class MongoDBAdapter:
         self.client: AsyncIOMotorClient | None = None
         self.db: AsyncIOMotorDatabase | None = None
         self.collection_name = "documents"
+        # Short-lived read cache; every write path for a doc_id evicts its entry
+        self._doc_cache: TTLCache[str, StoredDocument] = TTLCache(maxsize=1024, ttl=60)
 
     async def connect(self) -> None:
         """Establish connection to MongoDB."""
@@ -56,13 +140,10 @@ class MongoDBAdapter:
             self.client = AsyncIOMotorClient(self.connection_string)
             self.db = self.client.py_ai_platform
 
-            # Test connection
-            await self.client.admin.command("ping")
+            # Ping and index creation are independent round-trips; overlap them
+            await asyncio.gather(self.client.admin.command("ping"), self._create_indexes())
             logger.info("Successfully connected to MongoDB")
 
-            # Create indexes
-            await self._create_indexes()
-
         except Exception as e:
             logger.error(f"Failed to connect to MongoDB: {e}")
             raise
@@ -75,61 +156,74 @@ class MongoDBAdapter:
 
     async def _create_indexes(self) -> None:
         """Create necessary indexes for optimal performance."""
+        ensured_key = (self.connection_string, self.collection_name)
+        if ensured_key in MongoDBAdapter._indexes_ensured:
+            return
+
         collection = self.db[self.collection_name]
 
-        # Create indexes
-        indexes = [
-            [("metadata.upload_date", -1)],  # Sort by upload date
-            [("metadata.processing_status", 1)],  # Filter by status
-            [("metadata.vector_status", 1)],  # Filter by vector status
-            [("metadata.user_id", 1)],  # Filter by user
-            [("metadata.session_id", 1)],  # Filter by session
-            [("metadata.tags", 1)],  # Filter by tags
-            [("metadata.file_type", 1)],  # Filter by file type
-            [("content", "text")],  # Text search index
-        ]
+        # One createIndexes command for the whole set
+        try:
+            await collection.create_indexes(self._INDEX_MODELS)
+        except Exception as e:
+            logger.warning(f"Index creation failed: {e}")
+            return
 
-        for index in indexes:
-            try:
-                await collection.create_index(index)
-            except Exception as e:
-                logger.warning(f"Index creation failed: {e}")
+        MongoDBAdapter._indexes_ensured.add(ensured_key)
 
     async def store_document(self, doc_id: str, content: str, metadata: DocumentMetadata) -> str:
         """Store a document in MongoDB."""
-        if not self.db:
-            await self.connect()
+        await self.store_documents([(doc_id, content, metadata)])
+        return doc_id
+
+    async def store_documents(self, docs: list[tuple[str, str, DocumentMetadata]]) -> list[str]:
+        """Store a batch of (doc_id, content, metadata) documents in one round-trip."""
+        if not docs:
+            return []
 
         collection = self.db[self.collection_name]
 
-        document = StoredDocument(
-            id=doc_id,
-            content=content,
-            metadata=metadata,
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow(),
-        )
+        now = datetime.now(UTC)
+        # Same shape as StoredDocument.model_dump(), without building and dumping the model
+        payloads = [
+            {
+                "id": doc_id,
+                "content": content,
+                "metadata": metadata.model_dump(),
+                "chunks": [],
+                "created_at": now,
+                "updated_at": now,
+            }
+            for doc_id, content, metadata in docs
+        ]
+        doc_ids = [doc_id for doc_id, _, _ in docs]
+        for doc_id in doc_ids:
+            self._doc_cache.pop(doc_id, None)
 
         try:
-            await collection.insert_one(document.model_dump())
-            logger.info(f"Stored document {doc_id} in MongoDB")
-            return doc_id
+            # Unordered so one bad document does not stop the rest of the batch
+            await collection.insert_many(payloads, ordered=False)
+            logger.info(f"Stored {len(doc_ids)} document(s) in MongoDB")
+            return doc_ids
 
         except Exception as e:
-            logger.error(f"Failed to store document {doc_id}: {e}")
+            logger.error(f"Failed to store documents {doc_ids}: {e}")
             raise
 
     async def get_document(self, doc_id: str) -> StoredDocument | None:
         """Retrieve a document by ID."""
-        if not self.db:
-            await self.connect()
+        cached = self._doc_cache.get(doc_id)
+        if cached is not None:
+            return cached
 
         collection = self.db[self.collection_name]
 
         try:
             doc_data = await collection.find_one({"id": doc_id})
             if doc_data:
-                return StoredDocument(**doc_data)
+                document = _stored_document(doc_data)
+                self._doc_cache[doc_id] = document
+                return document
             return None
 
         except Exception as e:
@@ -143,25 +237,35 @@ class MongoDBAdapter:
         vector_status: str = None,
         chunk_count: int = None,
         chunks: list[dict] = None,
+        fire_and_forget: bool = False,
     ) -> bool:
-        """Update document processing status."""
-        if not self.db:
-            await self.connect()
+        """Update document processing status.
 
+        With ``fire_and_forget`` the write is sent unacknowledged (w=0) and True means only that
+        it was sent.
+        """
         collection = self.db[self.collection_name]
 
-        update_data = {"updated_at": datetime.utcnow()}
+        fields = (
+            ("metadata.processing_status", processing_status),
+            ("metadata.vector_status", vector_status),
+            ("metadata.chunk_count", chunk_count),
+            ("chunks", chunks),
+        )
+        update_data = {
+            "updated_at": datetime.now(UTC),
+            **{key: value for key, value in fields if value is not None},
+        }
 
-        if processing_status:
-            update_data["metadata.processing_status"] = processing_status
-        if vector_status:
-            update_data["metadata.vector_status"] = vector_status
-        if chunk_count is not None:
-            update_data["metadata.chunk_count"] = chunk_count
-        if chunks is not None:
-            update_data["chunks"] = chunks
+        self._doc_cache.pop(doc_id, None)
 
         try:
+            if fire_and_forget:
+                await collection.with_options(write_concern=_UNACKNOWLEDGED).update_one(
+                    {"id": doc_id}, {"$set": update_data}
+                )
+                return True
+
             result = await collection.update_one({"id": doc_id}, {"$set": update_data})
             return result.modified_count > 0
 
@@ -170,12 +274,17 @@ class MongoDBAdapter:
             return False
 
     async def search_documents(
-        self, query: str = None, filters: dict[str, Any] = None, limit: int = 100, skip: int = 0
-    ) -> list[StoredDocument]:
-        """Search documents with optional filters."""
-        if not self.db:
-            await self.connect()
-
+        self,
+        query: str = None,
+        filters: dict[str, Any] = None,
+        limit: int = 100,
+        skip: int = 0,
+        include_content: bool = False,
+    ) -> list[StoredDocument] | list[StoredDocumentSummary]:
+        """Search documents with optional filters.
+
+        Returns content-less summaries unless ``include_content`` is set.
+        """
         collection = self.db[self.collection_name]
 
         # Build MongoDB query
@@ -188,50 +297,35 @@ class MongoDBAdapter:
         # Apply filters
         if filters:
             for key, value in filters.items():
-                if key == "file_type":
-                    mongo_query["metadata.file_type"] = value
-                elif key == "processing_status":
-                    mongo_query["metadata.processing_status"] = value
-                elif key == "vector_status":
-                    mongo_query["metadata.vector_status"] = value
-                elif key == "user_id":
-                    mongo_query["metadata.user_id"] = value
-                elif key == "session_id":
-                    mongo_query["metadata.session_id"] = value
-                elif key == "tags":
-                    mongo_query["metadata.tags"] = {
-                        "$in": value if isinstance(value, list) else [value]
-                    }
-                elif key == "date_range" and ("start" in value or "end" in value):
-                    date_query = {}
-                    if "start" in value:
-                        date_query["$gte"] = value["start"]
-                    if "end" in value:
-                        date_query["$lte"] = value["end"]
-                    mongo_query["metadata.upload_date"] = date_query
+                field = _FILTER_FIELDS.get(key)
+                if field:
+                    mongo_query[field] = value
+                elif key in _SPECIAL_FILTERS:
+                    _SPECIAL_FILTERS[key](mongo_query, value)
 
         try:
-            cursor = collection.find(mongo_query).skip(skip).limit(limit)
+            projection = None if include_content else {"content": 0}
+            cursor = collection.find(mongo_query, projection).skip(skip).limit(limit)
 
             # Sort by relevance if text search, otherwise by date
-            if query:
-                cursor = cursor.sort([("score", {"$meta": "textScore"})])
-            else:
-                cursor = cursor.sort([("metadata.upload_date", -1)])
+            cursor = cursor.sort(_SORT_BY_SCORE if query else _SORT_BY_DATE)
 
-            documents = []
-            async for doc_data in cursor:
-                documents.append(StoredDocument(**doc_data))
-
-            return documents
+            # limit=0 means "no limit" to MongoDB; to_list takes None for that
+            records = await cursor.to_list(length=limit or None)
+            build = _stored_document if include_content else _document_summary
+            return [build(doc_data) for doc_data in records]
 
         except Exception as e:
             logger.error(f"Failed to search documents: {e}")
             return []
 
     async def list_documents(
-        self, user_id: str = None, session_id: str = None, limit: int = 50
-    ) -> list[StoredDocument]:
+        self,
+        user_id: str = None,
+        session_id: str = None,
+        limit: int = 50,
+        include_content: bool = False,
+    ) -> list[StoredDocument] | list[StoredDocumentSummary]:
         """List documents with optional user/session filtering."""
         filters = {}
         if user_id:
@@ -239,15 +333,16 @@ class MongoDBAdapter:
         if session_id:
             filters["session_id"] = session_id
 
-        return await self.search_documents(filters=filters, limit=limit)
+        return await self.search_documents(
+            filters=filters, limit=limit, include_content=include_content
+        )
 
     async def delete_document(self, doc_id: str) -> bool:
         """Delete a document from MongoDB."""
-        if not self.db:
-            await self.connect()
-
         collection = self.db[self.collection_name]
 
+        self._doc_cache.pop(doc_id, None)
+
         try:
             result = await collection.delete_one({"id": doc_id})
             if result.deleted_count > 0:
@@ -261,43 +356,54 @@ class MongoDBAdapter:
 
     async def get_statistics(self) -> dict[str, Any]:
         """Get database statistics."""
-        if not self.db:
-            await self.connect()
-
         collection = self.db[self.collection_name]
 
         try:
-            # Aggregate statistics
+            # Group server-side so only one row per distinct status/file type crosses the wire
             pipeline = [
                 {
-                    "$group": {
-                        "_id": None,
-                        "total_documents": {"$sum": 1},
-                        "total_size": {"$sum": "$metadata.file_size"},
-                        "avg_size": {"$avg": "$metadata.file_size"},
-                        "status_counts": {"$push": "$metadata.processing_status"},
-                        "file_types": {"$push": "$metadata.file_type"},
+                    "$facet": {
+                        "totals": [
+                            {
+                                "$group": {
+                                    "_id": None,
+                                    "total_documents": {"$sum": 1},
+                                    "total_size": {"$sum": "$metadata.file_size"},
+                                    "avg_size": {"$avg": "$metadata.file_size"},
+                                }
+                            }
+                        ],
+                        "status_counts": [
+                            {"$group": {"_id": "$metadata.processing_status", "count": {"$sum": 1}}}
+                        ],
+                        "file_types": [
+                            {"$group": {"_id": "$metadata.file_type", "count": {"$sum": 1}}}
+                        ],
                     }
                 }
             ]
 
             result = await collection.aggregate(pipeline).to_list(1)
+            facets = result[0] if result else {}
 
-            if result:
-                stats = result[0]
-
-                # Count statuses and file types
-                from collections import Counter
-
-                status_counts = Counter(stats.get("status_counts", []))
-                file_type_counts = Counter(stats.get("file_types", []))
+            if facets.get("totals"):
+                stats = facets["totals"][0]
 
                 return {
                     "total_documents": stats.get("total_documents", 0),
                     "total_size_bytes": stats.get("total_size", 0),
                     "average_size_bytes": stats.get("avg_size", 0),
-                    "status_distribution": dict(status_counts),
-                    "file_type_distribution": dict(file_type_counts),
+                    # Documents missing the field group under None; skip them
+                    "status_distribution": {
+                        row["_id"]: row["count"]
+                        for row in facets.get("status_counts", [])
+                        if row["_id"] is not None
+                    },
+                    "file_type_distribution": {
+                        row["_id"]: row["count"]
+                        for row in facets.get("file_types", [])
+                        if row["_id"] is not None
+                    },
                     "collection_name": self.collection_name,
                 }
 
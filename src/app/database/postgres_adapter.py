@@ -2,12 +2,17 @@
 
 from __future__ import annotations
 
-import json
+import asyncio
+import contextvars
 import logging
-from datetime import datetime
+from collections.abc import AsyncIterator, Coroutine, Mapping
+from contextlib import asynccontextmanager
+from datetime import UTC, date, datetime
 from typing import Any
 
 import asyncpg
+import orjson
+from cachetools import TTLCache
 from pydantic import BaseModel
 
 from app.config import get_settings
@@ -61,84 +66,663 @@ class DocumentProcessingLog(BaseModel):
     metadata: dict[str, Any] = {}
 
 
+# Statement text is kept constant so asyncpg's per-connection prepared-statement cache is hit
+# on every call: after the first use on a connection, only Bind/Execute go over the wire.
+# Holding PreparedStatement objects ourselves would not work with the pool, since asyncpg
+# invalidates them once their connection is released.
+STATEMENT_CACHE_SIZE = 256
+
+# Queries here are short OLTP lookups, where JIT compile time would exceed the execution time
+SERVER_SETTINGS = {"jit": "off", "application_name": "py-ai"}
+
+# Metrics and processing logs are observability data: losing the last few rows on a server
+# crash is acceptable, so they are written through a separate pool whose sessions commit
+# without waiting for the WAL fsync. Session writes stay on the durable main pool.
+ASYNC_COMMIT_SERVER_SETTINGS = {**SERVER_SETTINGS, "synchronous_commit": "off"}
+
+INSERT_SESSION_SQL = """
+    INSERT INTO agent_sessions
+    (session_id, user_id, agent_type, created_at, updated_at,
+     metadata, message_count, total_tokens, avg_response_time, status, response_time_sum)
+    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11)
+    ON CONFLICT (session_id) DO NOTHING
+    RETURNING session_id
+"""
+
+# Explicit column lists, in model field order, so rows map straight onto the models
+SESSION_COLUMNS = (
+    "session_id, user_id, agent_type, created_at, updated_at, "
+    "metadata, message_count, total_tokens, avg_response_time, status"
+)
+LOG_COLUMNS = (
+    "log_id, document_id, session_id, processing_stage, status, "
+    "timestamp, processing_time_ms, error_details, metadata"
+)
+
+GET_SESSION_SQL = f"SELECT {SESSION_COLUMNS} FROM agent_sessions WHERE session_id = $1"
+GET_SESSION_COUNTERS_SQL = """
+    SELECT message_count, total_tokens, avg_response_time, status
+    FROM agent_sessions WHERE session_id = $1
+"""
+
+# One static statement for every filter combination: a NULL parameter disables its filter.
+# $5 is the keyset cursor (the last updated_at of the previous page).
+LIST_SESSIONS_SQL = f"""
+    SELECT {SESSION_COLUMNS} FROM agent_sessions
+    WHERE ($1::text IS NULL OR user_id = $1)
+      AND ($2::text IS NULL OR agent_type = $2)
+      AND ($3::text IS NULL OR status = $3)
+      AND ($5::timestamptz IS NULL OR updated_at < $5)
+    ORDER BY updated_at DESC
+    LIMIT $4
+"""
+
+# Containment (@>) is the operator the jsonb_path_ops GIN index can serve
+LIST_SESSIONS_BY_METADATA_SQL = f"""
+    SELECT {SESSION_COLUMNS} FROM agent_sessions
+    WHERE metadata @> $1
+    ORDER BY updated_at DESC
+    LIMIT $2
+"""
+
+GET_PROCESSING_HISTORY_SQL = f"""
+    SELECT {LOG_COLUMNS} FROM document_processing_logs
+    WHERE document_id = $1
+    ORDER BY timestamp ASC
+"""
+
+# Same rows with the timestamp as epoch seconds, for bulk consumers that only sort, diff or
+# plot times: a float8 decodes to a plain float instead of a tz-aware datetime per row
+GET_PROCESSING_HISTORY_RAW_SQL = """
+    SELECT log_id, document_id, session_id, processing_stage, status,
+           EXTRACT(EPOCH FROM timestamp)::float8 AS timestamp,
+           processing_time_ms, error_details, metadata
+    FROM document_processing_logs
+    WHERE document_id = $1
+    ORDER BY document_processing_logs.timestamp ASC
+"""
+
+# The running total is kept in response_time_sum and the average derived from it, instead of
+# re-multiplying the stored (rounded) average on every update. SET expressions all read the
+# pre-update row and the row lock serializes concurrent updates, so a single UPDATE is atomic;
+# NULLIF keeps a zero-message update from dividing by zero.
+UPDATE_SESSION_METRICS_SQL = """
+    UPDATE agent_sessions
+    SET message_count = message_count + $1,
+        total_tokens = total_tokens + $2,
+        response_time_sum = response_time_sum + $3,
+        avg_response_time = COALESCE(
+            (response_time_sum + $3) / NULLIF(message_count + $1, 0), 0
+        ),
+        updated_at = NOW()
+    WHERE session_id = $4
+"""
+
+# update_session_metrics + record_metric fused into one statement (one round-trip, one commit)
+RECORD_TURN_SQL = """
+    WITH session_update AS (
+        UPDATE agent_sessions
+        SET message_count = message_count + $13,
+            total_tokens = total_tokens + $14,
+            response_time_sum = response_time_sum + $15,
+            avg_response_time = COALESCE(
+                (response_time_sum + $15) / NULLIF(message_count + $13, 0), 0
+            ),
+            updated_at = NOW()
+        WHERE session_id = $2
+    )
+    INSERT INTO agent_metrics
+    (metric_id, session_id, agent_type, endpoint, request_timestamp,
+     response_time_ms, token_count, success, error_message,
+     model_used, cost_estimate, user_feedback)
+    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12)
+"""
+
+# agent_metrics is pre-aggregated into 5-minute buckets so the stats query reads O(buckets)
+# rows instead of every metric. Latency is kept as a mergeable histogram (bin -> count over
+# LATENCY_BOUNDS_MS) because a per-bucket percentile cannot be combined across buckets.
+ROLLUP_BUCKET_SECONDS = 300
+LATENCY_BOUNDS_MS = (25.0, 50.0, 100.0, 250.0, 500.0, 1000.0, 2500.0, 5000.0, 10000.0, 30000.0)
+
+# Recompute every bucket that starts inside the lookback window ($2 seconds, aligned down
+# to a bucket boundary); buckets are rebuilt whole, so re-running is idempotent.
+REFRESH_ROLLUP_SQL = f"""
+    WITH binned AS (
+        SELECT
+            agent_type,
+            to_timestamp(
+                floor(extract(epoch FROM request_timestamp) / {ROLLUP_BUCKET_SECONDS})
+                * {ROLLUP_BUCKET_SECONDS}
+            ) AS bucket_start,
+            width_bucket(response_time_ms, $1::float8[]) AS bin,
+            COUNT(*) AS request_count,
+            SUM(response_time_ms) AS response_time_sum,
+            COALESCE(SUM(token_count), 0) AS token_sum,
+            COALESCE(SUM(cost_estimate), 0) AS cost_sum,
+            COUNT(*) FILTER (WHERE success) AS success_count,
+            COALESCE(SUM(user_feedback), 0) AS feedback_sum,
+            COUNT(user_feedback) AS feedback_count
+        FROM agent_metrics
+        WHERE request_timestamp >= to_timestamp(
+            floor(extract(epoch FROM NOW() - make_interval(secs => $2)) / {ROLLUP_BUCKET_SECONDS})
+            * {ROLLUP_BUCKET_SECONDS}
+        )
+        GROUP BY 1, 2, 3
+    )
+    INSERT INTO agent_metrics_rollup_5m
+    (agent_type, bucket_start, request_count, response_time_sum, token_sum, cost_sum,
+     success_count, feedback_sum, feedback_count, latency_histogram)
+    SELECT
+        agent_type, bucket_start, SUM(request_count), SUM(response_time_sum), SUM(token_sum),
+        SUM(cost_sum), SUM(success_count), SUM(feedback_sum), SUM(feedback_count),
+        jsonb_object_agg(bin, request_count)
+    FROM binned
+    GROUP BY agent_type, bucket_start
+    ON CONFLICT (agent_type, bucket_start) DO UPDATE SET
+        request_count = EXCLUDED.request_count,
+        response_time_sum = EXCLUDED.response_time_sum,
+        token_sum = EXCLUDED.token_sum,
+        cost_sum = EXCLUDED.cost_sum,
+        success_count = EXCLUDED.success_count,
+        feedback_sum = EXCLUDED.feedback_sum,
+        feedback_count = EXCLUDED.feedback_count,
+        latency_histogram = EXCLUDED.latency_histogram
+"""
+
+AGENT_STATS_SQL = """
+    SELECT
+        agent_type,
+        SUM(request_count)::bigint as total_requests,
+        SUM(response_time_sum) as response_time_sum,
+        SUM(token_sum)::bigint as total_tokens,
+        SUM(cost_sum) as total_cost,
+        SUM(success_count)::bigint as success_count,
+        SUM(feedback_sum)::bigint as feedback_sum,
+        SUM(feedback_count)::bigint as feedback_count,
+        jsonb_agg(latency_histogram) as latency_histograms
+    FROM agent_metrics_rollup_5m
+    WHERE bucket_start > NOW() - make_interval(hours => $1::int)
+      AND ($2::text IS NULL OR agent_type = $2)
+    GROUP BY agent_type
+    ORDER BY total_requests DESC
+"""
+
+# The background refresher rebuilds the last ROLLUP_LOOKBACK_SECONDS (late rows included)
+# every ROLLUP_REFRESH_INTERVAL seconds. The first refresh against a database backfills
+# ROLLUP_BACKFILL_SECONDS once and records that in agent_metrics_rollup_state; metrics older
+# than that window at the time are never rolled up, so the stats do not cover them.
+ROLLUP_REFRESH_INTERVAL = 60.0
+ROLLUP_LOOKBACK_SECONDS = 600
+ROLLUP_BACKFILL_SECONDS = 7 * 24 * 3600
+
+# Every worker process runs a refresher; a transaction-scoped advisory lock lets one of them
+# refresh at a time and the rest skip that round. The key is arbitrary but must stay fixed.
+ROLLUP_LOCK_KEY = 7_203_114_589_246_001
+TRY_ROLLUP_LOCK_SQL = "SELECT pg_try_advisory_xact_lock($1)"
+ROLLUP_BACKFILL_DONE_SQL = (
+    "SELECT EXISTS (SELECT 1 FROM agent_metrics_rollup_state WHERE name = 'backfill')"
+)
+MARK_ROLLUP_BACKFILL_SQL = """
+    INSERT INTO agent_metrics_rollup_state (name) VALUES ('backfill')
+    ON CONFLICT (name) DO NOTHING
+"""
+
+METRIC_COLUMNS = (
+    "metric_id",
+    "session_id",
+    "agent_type",
+    "endpoint",
+    "request_timestamp",
+    "response_time_ms",
+    "token_count",
+    "success",
+    "error_message",
+    "model_used",
+    "cost_estimate",
+    "user_feedback",
+)
+INSERT_METRIC_SQL = f"""
+    INSERT INTO agent_metrics ({", ".join(METRIC_COLUMNS)})
+    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12)
+"""
+
+INSERT_LOG_SQL = """
+    INSERT INTO document_processing_logs
+    (log_id, document_id, session_id, processing_stage, status,
+     timestamp, processing_time_ms, error_details, metadata)
+    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
+"""
+
+# Buffered metrics are written once this many are queued or this many seconds have passed
+METRIC_FLUSH_SIZE = 500
+METRIC_FLUSH_INTERVAL = 0.5
+
+# Buffered session counter deltas are merged per session and written this often
+SESSION_FLUSH_INTERVAL = 0.5
+
+# With postgres_session_counters_in_redis, update_session_metrics increments a Redis hash of
+# pending deltas per session and marks the session dirty; a background task moves the
+# pending deltas into agent_sessions in batches.
+SESSION_COUNTER_PREFIX = "agent_session"
+SESSION_COUNTER_DIRTY_KEY = f"{SESSION_COUNTER_PREFIX}:dirty"
+SESSION_COUNTER_PERSIST_INTERVAL = 10.0
+SESSION_COUNTER_PERSIST_BATCH = 500
+
+
+def _counter_key(session_id: str) -> str:
+    return f"{SESSION_COUNTER_PREFIX}:{session_id}:counters"
+
+
+def _counter_deltas(counters: Mapping[str, str]) -> tuple[int, int, float]:
+    """(messages, tokens, response_time_sum) from a Redis counter hash."""
+    return (
+        int(counters.get("message_count", 0)),
+        int(counters.get("total_tokens", 0)),
+        float(counters.get("response_time_sum", 0.0)),
+    )
+
+
+def _counter_row(session_id: str, counters: Mapping[str, str]) -> tuple[Any, ...]:
+    """Parameters for UPDATE_SESSION_METRICS_SQL from a Redis counter hash."""
+    return (*_counter_deltas(counters), session_id)
+
+
+def _merge_counters(
+    message_count: int, total_tokens: int, avg_response_time: float, counters: Mapping[str, str]
+) -> tuple[int, int, float]:
+    """Fold not-yet-persisted Redis deltas into counters read from PostgreSQL."""
+    messages, tokens, response_time = _counter_deltas(counters)
+    response_time_sum = avg_response_time * message_count + response_time
+    message_count += messages
+    if message_count:
+        avg_response_time = response_time_sum / message_count
+    return message_count, total_tokens + tokens, avg_response_time
+
+
+# agent_metrics and document_processing_logs are range-partitioned by month so time-bounded
+# queries prune to the matching partitions and old months can be detached. Partitions are
+# created this many months ahead; the DEFAULT partition only catches rows outside that window.
+PARTITIONED_TABLES = ("agent_metrics", "document_processing_logs")
+PARTITION_MONTHS_AHEAD = 3
+
+PARTITIONED_TABLES_SQL = """
+    SELECT c.relname FROM pg_partitioned_table p
+    JOIN pg_class c ON c.oid = p.partrelid
+    WHERE c.relname = ANY($1::text[])
+"""
+
+
+def _month_start(moment: datetime | date) -> date:
+    return date(moment.year, moment.month, 1)
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def _partition_ddl(table: str, month: date, months_ahead: int) -> list[str]:
+    """CREATE statements for ``table``'s monthly partitions from ``month`` onwards."""
+    statements = [f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT"]
+    for _ in range(months_ahead + 1):
+        upper = _next_month(month)
+        statements.append(
+            f"CREATE TABLE IF NOT EXISTS {table}_y{month.year}m{month.month:02d} "
+            f"PARTITION OF {table} FOR VALUES FROM ('{month}') TO ('{upper}')"
+        )
+        month = upper
+    return statements
+
+
+def _metric_record(metric: AgentMetrics) -> tuple[Any, ...]:
+    """Row tuple for agent_metrics in METRIC_COLUMNS order."""
+    return (
+        metric.metric_id,
+        metric.session_id,
+        metric.agent_type,
+        metric.endpoint,
+        metric.request_timestamp,
+        metric.response_time_ms,
+        metric.token_count,
+        metric.success,
+        metric.error_message,
+        metric.model_used,
+        metric.cost_estimate,
+        metric.user_feedback,
+    )
+
+
+def _log_record(log: DocumentProcessingLog) -> tuple[Any, ...]:
+    """Parameters for INSERT_LOG_SQL."""
+    return (
+        log.log_id,
+        log.document_id,
+        log.session_id,
+        log.processing_stage,
+        log.status,
+        log.timestamp,
+        log.processing_time_ms,
+        log.error_details or None,
+        log.metadata,
+    )
+
+
+# Rows are read by position, in SESSION_COLUMNS / LOG_COLUMNS order: indexing a Record is
+# cheaper than unpacking it as a mapping, which looks every column up by name
+def _session_from_row(row: asyncpg.Record) -> AgentSession:
+    """Build an AgentSession from a SESSION_COLUMNS row without re-validating it."""
+    return AgentSession.model_construct(
+        session_id=row[0],
+        user_id=row[1],
+        agent_type=row[2],
+        created_at=row[3],
+        updated_at=row[4],
+        metadata=row[5],
+        message_count=row[6],
+        total_tokens=row[7],
+        avg_response_time=row[8],
+        status=row[9],
+    )
+
+
+def _log_from_row(row: asyncpg.Record) -> DocumentProcessingLog:
+    """Build a DocumentProcessingLog from a LOG_COLUMNS row without re-validating it."""
+    return DocumentProcessingLog.model_construct(
+        log_id=row[0],
+        document_id=row[1],
+        session_id=row[2],
+        processing_stage=row[3],
+        status=row[4],
+        timestamp=row[5],
+        processing_time_ms=row[6],
+        error_details=row[7],
+        metadata=row[8],
+    )
+
+
+def _histogram_quantile(q: float, histograms: list[dict[str, int]]) -> float:
+    """Estimate a latency quantile from merged LATENCY_BOUNDS_MS histograms.
+
+    Interpolates linearly inside the bin holding the target rank; the open-ended top bin
+    reports its lower bound.
+    """
+    counts = [0] * (len(LATENCY_BOUNDS_MS) + 1)
+    for histogram in histograms:
+        for bin_index, count in histogram.items():
+            counts[int(bin_index)] += count
+    total = sum(counts)
+    if not total:
+        return 0.0
+
+    rank = q * total
+    seen = 0
+    for bin_index, count in enumerate(counts):
+        if count and seen + count >= rank:
+            lower = LATENCY_BOUNDS_MS[bin_index - 1] if bin_index else 0.0
+            if bin_index == len(LATENCY_BOUNDS_MS):
+                return lower
+            upper = LATENCY_BOUNDS_MS[bin_index]
+            return lower + (upper - lower) * (rank - seen) / count
+        seen += count
+    return LATENCY_BOUNDS_MS[-1]
+
+
+def _encode_jsonb(value: Any) -> bytes:
+    # Binary jsonb is a version byte (1) followed by the JSON text
+    return b"\x01" + orjson.dumps(value)
+
+
+def _decode_jsonb(data: bytes) -> Any:
+    return orjson.loads(data[1:])
+
+
+async def _init_connection(conn: asyncpg.Connection) -> None:
+    """Pool init hook: exchange JSONB as dicts, encoded and decoded with orjson."""
+    await conn.set_type_codec(
+        "jsonb",
+        encoder=_encode_jsonb,
+        decoder=_decode_jsonb,
+        schema="pg_catalog",
+        format="binary",
+    )
+
+
+# Connection bound by PostgreSQLAdapter.connection() for the current task
+_current_conn: contextvars.ContextVar[asyncpg.Connection | None] = contextvars.ContextVar(
+    "postgres_connection", default=None
+)
+
+
+def _background_task(coro: Coroutine[Any, Any, None]) -> asyncio.Task:
+    # Started with an empty context so a flusher created inside connection() never inherits
+    # (and outlives) the caller's bound connection
+    return asyncio.create_task(coro, context=contextvars.Context())
+
+
 class PostgreSQLAdapter:
     """PostgreSQL adapter for metadata and session management."""
 
     def __init__(self, connection_string: str = None):
         settings = get_settings()
         self.connection_string = connection_string or settings.postgres_url
+        self.pool_max_size = max(1, settings.postgres_pool_max_size)
+        self.pool_min_size = min(settings.postgres_pool_min_size, self.pool_max_size)
         self.pool: asyncpg.Pool | None = None
+        self.async_commit_pool: asyncpg.Pool | None = None
+        self._metric_queue: asyncio.Queue[AgentMetrics] = asyncio.Queue()
+        self._metric_flusher: asyncio.Task | None = None
+        self._rollup_refresher: asyncio.Task | None = None
+        # session_id -> [message_count_delta, tokens_delta, response_time_sum]
+        self._session_deltas: dict[str, list[float]] = {}
+        self._session_flusher: asyncio.Task | None = None
+        self._redis_url = (
+            settings.redis_url if settings.postgres_session_counters_in_redis else None
+        )
+        self._redis = None
+        self._counter_persister: asyncio.Task | None = None
+        # (agent_type, time_range_hours) -> stats; the rollup only changes on refresh, which
+        # clears it, and the TTL covers refreshes done by other processes
+        self._stats_cache: TTLCache[tuple[str | None, int], dict[str, Any]] = TTLCache(
+            maxsize=64, ttl=ROLLUP_REFRESH_INTERVAL
+        )
 
     async def connect(self) -> None:
         """Establish connection pool to PostgreSQL."""
         try:
             self.pool = await asyncpg.create_pool(
-                self.connection_string, min_size=5, max_size=20, command_timeout=60
+                self.connection_string,
+                min_size=self.pool_min_size,
+                max_size=self.pool_max_size,
+                command_timeout=60,
+                statement_cache_size=STATEMENT_CACHE_SIZE,
+                server_settings=SERVER_SETTINGS,
+                init=_init_connection,
+            )
+            self.async_commit_pool = await asyncpg.create_pool(
+                self.connection_string,
+                min_size=1,
+                max_size=max(1, self.pool_max_size // 2),
+                command_timeout=60,
+                statement_cache_size=STATEMENT_CACHE_SIZE,
+                server_settings=ASYNC_COMMIT_SERVER_SETTINGS,
+                init=_init_connection,
             )
             logger.info("Successfully connected to PostgreSQL")
 
             # Create tables if they don't exist
             await self._create_tables()
 
+            self._rollup_refresher = _background_task(self._refresh_rollup_forever())
+
+            if self._redis_url:
+                from redis import asyncio as redis_async
+
+                self._redis = redis_async.from_url(self._redis_url, decode_responses=True)
+                self._counter_persister = _background_task(self._persist_session_counters_forever())
+
         except Exception as e:
             logger.error(f"Failed to connect to PostgreSQL: {e}")
             raise
 
     async def disconnect(self) -> None:
         """Close PostgreSQL connection pool."""
+        if self._metric_flusher:
+            self._metric_flusher.cancel()
+            self._metric_flusher = None
+        if self._rollup_refresher:
+            self._rollup_refresher.cancel()
+            self._rollup_refresher = None
+        if self._session_flusher:
+            self._session_flusher.cancel()
+            self._session_flusher = None
+        if self._counter_persister:
+            self._counter_persister.cancel()
+            self._counter_persister = None
         if self.pool:
+            await self.flush_metrics()
+            await self.flush_session_metrics()
+            if self._redis is not None:
+                await self.persist_session_counters()
+                await self._redis.aclose()
+                self._redis = None
+            if self.async_commit_pool:
+                await self.async_commit_pool.close()
             await self.pool.close()
             logger.info("Disconnected from PostgreSQL")
 
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[asyncpg.Connection]:
+        """Check out one pooled connection and reuse it for every adapter call in this block.
+
+        Grouping the calls of one unit of work (e.g. ``get_session`` + ``record_turn``) this
+        way costs a single pool acquire instead of one per call. Nested uses share the outer
+        connection. A connection runs one query at a time, so do not ``gather`` adapter calls
+        inside the block.
+        """
+        conn = _current_conn.get()
+        if conn is not None:
+            yield conn
+            return
+
+        async with self.pool.acquire() as conn:
+            token = _current_conn.set(conn)
+            try:
+                yield conn
+            finally:
+                _current_conn.reset(token)
+
+    async def _ensure_partitions(
+        self, conn: asyncpg.Connection, months_ahead: int = PARTITION_MONTHS_AHEAD
+    ) -> None:
+        """Create this month's and the next ``months_ahead`` months' partitions.
+
+        Tables created before partitioning was introduced are plain tables and are skipped.
+        """
+        rows = await conn.fetch(PARTITIONED_TABLES_SQL, list(PARTITIONED_TABLES))
+        month = _month_start(datetime.now(UTC))
+        for row in rows:
+            for ddl in _partition_ddl(row["relname"], month, months_ahead):
+                await conn.execute(ddl)
+
     async def _create_tables(self) -> None:
         """Create necessary tables and indexes."""
-        async with self.pool.acquire() as conn:
+        async with self.connection() as conn:
+            # Columns are declared widest fixed-width first (8-byte, then 4-byte, then bool) with
+            # the variable-length ones last, so rows carry no alignment padding. Every query
+            # names its columns, so the physical order is free to differ from the models.
+
             # Agent sessions table
             await conn.execute("""
                 CREATE TABLE IF NOT EXISTS agent_sessions (
-                    session_id VARCHAR(255) PRIMARY KEY,
-                    user_id VARCHAR(255),
-                    agent_type VARCHAR(50) NOT NULL,
                     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
                     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-                    metadata JSONB DEFAULT '{}',
+                    avg_response_time FLOAT DEFAULT 0.0,
+                    response_time_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
                     message_count INTEGER DEFAULT 0,
                     total_tokens INTEGER DEFAULT 0,
-                    avg_response_time FLOAT DEFAULT 0.0,
-                    status VARCHAR(20) DEFAULT 'active'
+                    session_id VARCHAR(255) PRIMARY KEY,
+                    user_id VARCHAR(255),
+                    agent_type VARCHAR(50) NOT NULL,
+                    status VARCHAR(20) DEFAULT 'active',
+                    metadata JSONB DEFAULT '{}'
                 )
             """)
 
+            # Older tables predate response_time_sum; add it once and seed it from the average
+            await conn.execute("""
+                DO $$
+                BEGIN
+                    IF NOT EXISTS (
+                        SELECT 1 FROM information_schema.columns
+                        WHERE table_name = 'agent_sessions'
+                          AND column_name = 'response_time_sum'
+                    ) THEN
+                        ALTER TABLE agent_sessions
+                            ADD COLUMN response_time_sum DOUBLE PRECISION NOT NULL DEFAULT 0;
+                        UPDATE agent_sessions
+                        SET response_time_sum = COALESCE(avg_response_time * message_count, 0);
+                    END IF;
+                END
+                $$
+            """)
+
             # Agent metrics table
             await conn.execute("""
                 CREATE TABLE IF NOT EXISTS agent_metrics (
-                    metric_id VARCHAR(255) PRIMARY KEY,
-                    session_id VARCHAR(255) REFERENCES agent_sessions(session_id),
-                    agent_type VARCHAR(50) NOT NULL,
-                    endpoint VARCHAR(255) NOT NULL,
-                    request_timestamp TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+                    request_timestamp TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
                     response_time_ms FLOAT NOT NULL,
+                    cost_estimate FLOAT DEFAULT 0.0,
                     token_count INTEGER DEFAULT 0,
+                    user_feedback INTEGER CHECK (user_feedback >= 1 AND user_feedback <= 5),
                     success BOOLEAN DEFAULT TRUE,
-                    error_message TEXT,
+                    metric_id VARCHAR(255) NOT NULL,
+                    session_id VARCHAR(255) REFERENCES agent_sessions(session_id),
+                    agent_type VARCHAR(50) NOT NULL,
+                    endpoint VARCHAR(255) NOT NULL,
                     model_used VARCHAR(100),
-                    cost_estimate FLOAT DEFAULT 0.0,
-                    user_feedback INTEGER CHECK (user_feedback >= 1 AND user_feedback <= 5)
-                )
+                    error_message TEXT,
+                    PRIMARY KEY (metric_id, request_timestamp)
+                ) PARTITION BY RANGE (request_timestamp)
             """)
 
             # Document processing logs table
             await conn.execute("""
                 CREATE TABLE IF NOT EXISTS document_processing_logs (
-                    log_id VARCHAR(255) PRIMARY KEY,
+                    timestamp TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+                    processing_time_ms FLOAT,
+                    log_id VARCHAR(255) NOT NULL,
                     document_id VARCHAR(255) NOT NULL,
                     session_id VARCHAR(255),
                     processing_stage VARCHAR(50) NOT NULL,
                     status VARCHAR(20) NOT NULL,
-                    timestamp TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-                    processing_time_ms FLOAT,
                     error_details JSONB,
-                    metadata JSONB DEFAULT '{}'
+                    metadata JSONB DEFAULT '{}',
+                    PRIMARY KEY (log_id, timestamp)
+                ) PARTITION BY RANGE (timestamp)
+            """)
+
+            await self._ensure_partitions(conn)
+
+            # 5-minute rollup of agent_metrics read by get_agent_performance_stats; rows are
+            # rewritten in place on refresh, so leave page room for HOT updates
+            await conn.execute("""
+                CREATE TABLE IF NOT EXISTS agent_metrics_rollup_5m (
+                    bucket_start TIMESTAMP WITH TIME ZONE NOT NULL,
+                    request_count BIGINT NOT NULL,
+                    response_time_sum DOUBLE PRECISION NOT NULL,
+                    token_sum BIGINT NOT NULL,
+                    cost_sum DOUBLE PRECISION NOT NULL,
+                    success_count BIGINT NOT NULL,
+                    feedback_sum BIGINT NOT NULL,
+                    feedback_count BIGINT NOT NULL,
+                    agent_type VARCHAR(50) NOT NULL,
+                    latency_histogram JSONB NOT NULL,
+                    PRIMARY KEY (agent_type, bucket_start)
+                ) WITH (fillfactor = 70)
+            """)
+            await conn.execute("""
+                CREATE TABLE IF NOT EXISTS agent_metrics_rollup_state (
+                    name VARCHAR(50) PRIMARY KEY,
+                    completed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
                 )
             """)
 
@@ -151,12 +735,21 @@ class PostgreSQLAdapter:
                 "CREATE INDEX IF NOT EXISTS idx_agent_sessions_created_at "
                 "ON agent_sessions(created_at)",
                 "CREATE INDEX IF NOT EXISTS idx_agent_sessions_status " "ON agent_sessions(status)",
+                # Serves list_sessions' ORDER BY updated_at DESC and its keyset cursor
+                "CREATE INDEX IF NOT EXISTS idx_agent_sessions_updated_at_desc "
+                "ON agent_sessions (updated_at DESC) "
+                "INCLUDE (session_id, user_id, agent_type, status)",
                 "CREATE INDEX IF NOT EXISTS idx_agent_metrics_session_id "
                 "ON agent_metrics(session_id)",
                 "CREATE INDEX IF NOT EXISTS idx_agent_metrics_agent_type "
                 "ON agent_metrics(agent_type)",
-                "CREATE INDEX IF NOT EXISTS idx_agent_metrics_timestamp "
-                "ON agent_metrics(request_timestamp)",
+                # Both log tables are append-only, so rows are physically in time order and a
+                # BRIN range index replaces the much larger B-tree; autosummarize keeps newly
+                # filled block ranges indexed without waiting for a manual summarize
+                "DROP INDEX IF EXISTS idx_agent_metrics_timestamp",
+                "CREATE INDEX IF NOT EXISTS idx_agent_metrics_timestamp_brin "
+                "ON agent_metrics USING BRIN (request_timestamp) "
+                "WITH (pages_per_range = 32, autosummarize = on)",
                 "CREATE INDEX IF NOT EXISTS idx_agent_metrics_success " "ON agent_metrics(success)",
                 "CREATE INDEX IF NOT EXISTS idx_doc_logs_document_id "
                 "ON document_processing_logs(document_id)",
@@ -164,8 +757,17 @@ class PostgreSQLAdapter:
                 "ON document_processing_logs(session_id)",
                 "CREATE INDEX IF NOT EXISTS idx_doc_logs_stage "
                 "ON document_processing_logs(processing_stage)",
-                "CREATE INDEX IF NOT EXISTS idx_doc_logs_timestamp "
-                "ON document_processing_logs(timestamp)",
+                "DROP INDEX IF EXISTS idx_doc_logs_timestamp",
+                "CREATE INDEX IF NOT EXISTS idx_doc_logs_timestamp_brin "
+                "ON document_processing_logs USING BRIN (timestamp) "
+                "WITH (pages_per_range = 32, autosummarize = on)",
+                # jsonb_path_ops GIN indexes serve @> containment lookups
+                "CREATE INDEX IF NOT EXISTS idx_agent_sessions_metadata_gin "
+                "ON agent_sessions USING GIN (metadata jsonb_path_ops)",
+                "CREATE INDEX IF NOT EXISTS idx_doc_logs_metadata_gin "
+                "ON document_processing_logs USING GIN (metadata jsonb_path_ops)",
+                "CREATE INDEX IF NOT EXISTS idx_doc_logs_error_details_gin "
+                "ON document_processing_logs USING GIN (error_details jsonb_path_ops)",
             ]
 
             for index_sql in indexes:
@@ -176,27 +778,31 @@ class PostgreSQLAdapter:
 
     # Session Management
     async def create_session(self, session: AgentSession) -> bool:
-        """Create a new agent session."""
-        async with self.pool.acquire() as conn:
+        """Create a new agent session.
+
+        Returns False without raising when the session already exists, which is the normal
+        outcome when parallel first-message handlers race to create it.
+        """
+        async with self.connection() as conn:
             try:
-                await conn.execute(
-                    """
-                    INSERT INTO agent_sessions 
-                    (session_id, user_id, agent_type, created_at, updated_at, 
-                     metadata, message_count, total_tokens, avg_response_time, status)
-                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
-                """,
+                created = await conn.fetchval(
+                    INSERT_SESSION_SQL,
                     session.session_id,
                     session.user_id,
                     session.agent_type,
                     session.created_at,
                     session.updated_at,
-                    json.dumps(session.metadata),
+                    session.metadata,
                     session.message_count,
                     session.total_tokens,
                     session.avg_response_time,
                     session.status,
+                    # Computed here: "$9 * $7" leaves both operands untyped at prepare time
+                    session.avg_response_time * session.message_count,
                 )
+                if created is None:
+                    logger.debug(f"Session {session.session_id} already exists")
+                    return False
 
                 logger.info(f"Created session {session.session_id} for agent {session.agent_type}")
                 return True
@@ -207,32 +813,60 @@ class PostgreSQLAdapter:
 
     async def get_session(self, session_id: str) -> AgentSession | None:
         """Get session by ID."""
-        async with self.pool.acquire() as conn:
+        async with self.connection() as conn:
             try:
-                row = await conn.fetchrow(
-                    """
-                    SELECT * FROM agent_sessions WHERE session_id = $1
-                """,
-                    session_id,
-                )
+                row = await conn.fetchrow(GET_SESSION_SQL, session_id)
+
+                if not row:
+                    return None
+                session = _session_from_row(row)
+                if self._redis is not None:
+                    counters = await self._redis.hgetall(_counter_key(session_id))
+                    if counters:
+                        (
+                            session.message_count,
+                            session.total_tokens,
+                            session.avg_response_time,
+                        ) = _merge_counters(
+                            session.message_count,
+                            session.total_tokens,
+                            session.avg_response_time,
+                            counters,
+                        )
+                return session
 
-                if row:
-                    return AgentSession(
-                        session_id=row["session_id"],
-                        user_id=row["user_id"],
-                        agent_type=row["agent_type"],
-                        created_at=row["created_at"],
-                        updated_at=row["updated_at"],
-                        metadata=row["metadata"],
-                        message_count=row["message_count"],
-                        total_tokens=row["total_tokens"],
-                        avg_response_time=row["avg_response_time"],
-                        status=row["status"],
-                    )
+            except Exception as e:
+                logger.error(f"Failed to get session {session_id}: {e}")
                 return None
 
+    async def get_session_counters(self, session_id: str) -> Mapping[str, Any] | None:
+        """Get just a session's counters and status, for hot read-modify-write paths.
+
+        Skips the metadata JSONB and the AgentSession model: the asyncpg Record is returned
+        as is (a plain dict when unpersisted Redis deltas had to be folded in). Keys are
+        message_count, total_tokens, avg_response_time and status.
+        """
+        async with self.connection() as conn:
+            try:
+                row = await conn.fetchrow(GET_SESSION_COUNTERS_SQL, session_id)
+
+                if row is None or self._redis is None:
+                    return row
+                counters = await self._redis.hgetall(_counter_key(session_id))
+                if not counters:
+                    return row
+                message_count, total_tokens, avg_response_time = _merge_counters(
+                    row["message_count"], row["total_tokens"], row["avg_response_time"], counters
+                )
+                return {
+                    "message_count": message_count,
+                    "total_tokens": total_tokens,
+                    "avg_response_time": avg_response_time,
+                    "status": row["status"],
+                }
+
             except Exception as e:
-                logger.error(f"Failed to get session {session_id}: {e}")
+                logger.error(f"Failed to get session counters {session_id}: {e}")
                 return None
 
     async def update_session_metrics(
@@ -242,20 +876,26 @@ class PostgreSQLAdapter:
         tokens_delta: int = 0,
         response_time: float = 0.0,
     ) -> bool:
-        """Update session metrics incrementally."""
-        async with self.pool.acquire() as conn:
+        """Update session metrics incrementally.
+
+        When session counters live in Redis this only increments the pending deltas; they
+        reach agent_sessions within SESSION_COUNTER_PERSIST_INTERVAL seconds.
+        """
+        if self._redis is not None:
+            try:
+                await self._increment_session_counters(
+                    session_id, message_count_delta, tokens_delta, response_time
+                )
+                return True
+
+            except Exception as e:
+                logger.error(f"Failed to update session metrics {session_id}: {e}")
+                return False
+
+        async with self.connection() as conn:
             try:
-                # Calculate new average response time
                 await conn.execute(
-                    """
-                    UPDATE agent_sessions 
-                    SET message_count = message_count + $1,
-                        total_tokens = total_tokens + $2,
-                        avg_response_time = (avg_response_time * message_count + $3) / 
-                            (message_count + $1),
-                        updated_at = NOW()
-                    WHERE session_id = $4
-                """,
+                    UPDATE_SESSION_METRICS_SQL,
                     message_count_delta,
                     tokens_delta,
                     response_time,
@@ -268,213 +908,393 @@ class PostgreSQLAdapter:
                 logger.error(f"Failed to update session metrics {session_id}: {e}")
                 return False
 
+    def buffer_session_metrics(
+        self,
+        session_id: str,
+        message_count_delta: int = 1,
+        tokens_delta: int = 0,
+        response_time: float = 0.0,
+    ) -> None:
+        """Accumulate a session counter update in memory instead of writing it now.
+
+        Deltas for the same session are merged and written with one executemany every
+        SESSION_FLUSH_INTERVAL seconds; ``disconnect()`` writes whatever is left.
+        """
+        deltas = self._session_deltas.get(session_id)
+        if deltas is None:
+            self._session_deltas[session_id] = [message_count_delta, tokens_delta, response_time]
+        else:
+            deltas[0] += message_count_delta
+            deltas[1] += tokens_delta
+            deltas[2] += response_time
+        if self._session_flusher is None:
+            self._session_flusher = _background_task(self._flush_session_metrics_forever())
+
+    async def flush_session_metrics(self) -> bool:
+        """Write every buffered session counter update now."""
+        deltas, self._session_deltas = self._session_deltas, {}
+        if not deltas:
+            return True
+
+        # Sorted so concurrent flushers lock session rows in the same order
+        rows = [
+            (messages, tokens, response_time, session_id)
+            for session_id, (messages, tokens, response_time) in sorted(deltas.items())
+        ]
+        async with self.connection() as conn:
+            try:
+                await conn.executemany(UPDATE_SESSION_METRICS_SQL, rows)
+
+                return True
+
+            except Exception as e:
+                logger.error(f"Failed to flush metrics for {len(rows)} sessions: {e}")
+                return False
+
+    async def _flush_session_metrics_forever(self) -> None:
+        while True:
+            await asyncio.sleep(SESSION_FLUSH_INTERVAL)
+            await self.flush_session_metrics()
+
+    async def _increment_session_counters(
+        self, session_id: str, message_count_delta: int, tokens_delta: int, response_time: float
+    ) -> None:
+        key = _counter_key(session_id)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hincrby(key, "message_count", message_count_delta)
+            pipe.hincrby(key, "total_tokens", tokens_delta)
+            pipe.hincrbyfloat(key, "response_time_sum", response_time)
+            pipe.sadd(SESSION_COUNTER_DIRTY_KEY, session_id)
+            await pipe.execute()
+
+    async def persist_session_counters(self) -> bool:
+        """Move every pending Redis session counter delta into agent_sessions."""
+        while True:
+            session_ids = await self._redis.spop(
+                SESSION_COUNTER_DIRTY_KEY, SESSION_COUNTER_PERSIST_BATCH
+            )
+            if not session_ids:
+                return True
+
+            # Read and delete in one MULTI so increments racing the persist are never lost:
+            # they either land in this snapshot or in a fresh hash that re-marks the session
+            async with self._redis.pipeline(transaction=True) as pipe:
+                for session_id in session_ids:
+                    pipe.hgetall(_counter_key(session_id))
+                    pipe.delete(_counter_key(session_id))
+                results = await pipe.execute()
+            rows = [
+                _counter_row(session_id, counters)
+                for session_id, counters in zip(session_ids, results[::2], strict=True)
+                if counters
+            ]
+            if not rows:
+                continue
+
+            # Same row lock order as flush_session_metrics
+            rows.sort(key=lambda row: row[3])
+            async with self.connection() as conn:
+                try:
+                    await conn.executemany(UPDATE_SESSION_METRICS_SQL, rows)
+
+                except Exception as e:
+                    logger.error(f"Failed to persist counters for {len(rows)} sessions: {e}")
+                    # Put the deltas back so the next persist retries them
+                    for messages, tokens, response_time, session_id in rows:
+                        await self._increment_session_counters(
+                            session_id, messages, tokens, response_time
+                        )
+                    return False
+
+    async def _persist_session_counters_forever(self) -> None:
+        while True:
+            await asyncio.sleep(SESSION_COUNTER_PERSIST_INTERVAL)
+            try:
+                await self.persist_session_counters()
+            except Exception as e:
+                logger.warning(f"Session counter persist failed: {e}")
+
     async def list_sessions(
-        self, user_id: str = None, agent_type: str = None, status: str = None, limit: int = 50
+        self,
+        user_id: str = None,
+        agent_type: str = None,
+        status: str = None,
+        limit: int = 50,
+        after: datetime | None = None,
     ) -> list[AgentSession]:
-        """List sessions with optional filters."""
-        async with self.pool.acquire() as conn:
+        """List sessions with optional filters, most recently updated first.
+
+        For the next page pass ``after=`` the ``updated_at`` of the last session returned.
+        """
+        async with self.connection() as conn:
             try:
-                conditions = []
-                params = []
-                param_count = 0
-
-                if user_id:
-                    param_count += 1
-                    conditions.append(f"user_id = ${param_count}")
-                    params.append(user_id)
-
-                if agent_type:
-                    param_count += 1
-                    conditions.append(f"agent_type = ${param_count}")
-                    params.append(agent_type)
-
-                if status:
-                    param_count += 1
-                    conditions.append(f"status = ${param_count}")
-                    params.append(status)
-
-                where_clause = "WHERE " + " AND ".join(conditions) if conditions else ""
-
-                param_count += 1
-                params.append(limit)
-
-                query = f"""
-                    SELECT * FROM agent_sessions 
-                    {where_clause}
-                    ORDER BY updated_at DESC 
-                    LIMIT ${param_count}
-                """
-
-                rows = await conn.fetch(query, *params)
-
-                return [
-                    AgentSession(
-                        session_id=row["session_id"],
-                        user_id=row["user_id"],
-                        agent_type=row["agent_type"],
-                        created_at=row["created_at"],
-                        updated_at=row["updated_at"],
-                        metadata=row["metadata"],
-                        message_count=row["message_count"],
-                        total_tokens=row["total_tokens"],
-                        avg_response_time=row["avg_response_time"],
-                        status=row["status"],
-                    )
-                    for row in rows
-                ]
+                # Empty filters mean "any", as before
+                rows = await conn.fetch(
+                    LIST_SESSIONS_SQL,
+                    user_id or None,
+                    agent_type or None,
+                    status or None,
+                    limit,
+                    after,
+                )
+
+                return [_session_from_row(row) for row in rows]
 
             except Exception as e:
                 logger.error(f"Failed to list sessions: {e}")
                 return []
 
+    async def list_sessions_by_metadata(
+        self, match: dict[str, Any], limit: int = 50
+    ) -> list[AgentSession]:
+        """List sessions whose metadata contains every key/value pair in ``match``."""
+        async with self.connection() as conn:
+            try:
+                rows = await conn.fetch(LIST_SESSIONS_BY_METADATA_SQL, match, limit)
+
+                return [_session_from_row(row) for row in rows]
+
+            except Exception as e:
+                logger.error(f"Failed to list sessions by metadata: {e}")
+                return []
+
     # Metrics Management
     async def record_metric(self, metric: AgentMetrics) -> bool:
         """Record an agent performance metric."""
-        async with self.pool.acquire() as conn:
+        async with self.async_commit_pool.acquire() as conn:
+            try:
+                await conn.execute(INSERT_METRIC_SQL, *_metric_record(metric))
+
+                return True
+
+            except Exception as e:
+                logger.error(f"Failed to record metric {metric.metric_id}: {e}")
+                return False
+
+    async def record_turn(
+        self,
+        metric: AgentMetrics,
+        message_count_delta: int = 1,
+        tokens_delta: int = 0,
+        response_time: float = 0.0,
+    ) -> bool:
+        """Update the metric's session counters and record the metric in one round-trip.
+
+        Prefer this over calling ``update_session_metrics`` and ``record_metric`` back to back.
+        """
+        async with self.connection() as conn:
             try:
                 await conn.execute(
-                    """
-                    INSERT INTO agent_metrics 
-                    (metric_id, session_id, agent_type, endpoint, request_timestamp,
-                     response_time_ms, token_count, success, error_message,
-                     model_used, cost_estimate, user_feedback)
-                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12)
-                """,
-                    metric.metric_id,
-                    metric.session_id,
-                    metric.agent_type,
-                    metric.endpoint,
-                    metric.request_timestamp,
-                    metric.response_time_ms,
-                    metric.token_count,
-                    metric.success,
-                    metric.error_message,
-                    metric.model_used,
-                    metric.cost_estimate,
-                    metric.user_feedback,
+                    RECORD_TURN_SQL,
+                    *_metric_record(metric),
+                    message_count_delta,
+                    tokens_delta,
+                    response_time,
                 )
 
                 return True
 
             except Exception as e:
-                logger.error(f"Failed to record metric {metric.metric_id}: {e}")
+                logger.error(f"Failed to record turn for session {metric.session_id}: {e}")
                 return False
 
+    async def record_metrics_batch(self, metrics: list[AgentMetrics]) -> bool:
+        """Record many metrics with a single COPY instead of one INSERT per row."""
+        if not metrics:
+            return True
+        if len(metrics) == 1:
+            # COPY costs extra round-trips (column lookup, COPY setup) that one row never repays
+            return await self.record_metric(metrics[0])
+
+        async with self.async_commit_pool.acquire() as conn:
+            try:
+                await conn.copy_records_to_table(
+                    "agent_metrics",
+                    records=[_metric_record(metric) for metric in metrics],
+                    columns=METRIC_COLUMNS,
+                )
+
+                return True
+
+            except Exception as e:
+                logger.error(f"Failed to record {len(metrics)} metric(s): {e}")
+                return False
+
+    def buffer_metric(self, metric: AgentMetrics) -> None:
+        """Queue a metric for the next batched write instead of inserting it now.
+
+        A background task writes the queue every METRIC_FLUSH_SIZE metrics or
+        METRIC_FLUSH_INTERVAL seconds; ``disconnect()`` writes whatever is left.
+        """
+        self._metric_queue.put_nowait(metric)
+        if self._metric_flusher is None:
+            self._metric_flusher = _background_task(self._flush_metrics_forever())
+
+    async def flush_metrics(self) -> None:
+        """Write every buffered metric now."""
+        batch = []
+        while not self._metric_queue.empty():
+            batch.append(self._metric_queue.get_nowait())
+        await self.record_metrics_batch(batch)
+
+    async def _flush_metrics_forever(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._metric_queue.get()]
+            deadline = loop.time() + METRIC_FLUSH_INTERVAL
+            while len(batch) < METRIC_FLUSH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._metric_queue.get(), timeout))
+                except TimeoutError:
+                    break
+            await self.record_metrics_batch(batch)
+
     async def get_agent_performance_stats(
         self, agent_type: str = None, time_range_hours: int = 24
     ) -> dict[str, Any]:
-        """Get performance statistics for agents."""
-        async with self.pool.acquire() as conn:
+        """Get performance statistics for agents from the 5-minute rollup.
+
+        Figures are as fresh as the last rollup refresh (ROLLUP_REFRESH_INTERVAL), the window
+        has 5-minute granularity, and p95 is estimated from the latency histogram. Metrics
+        older than the one-time ROLLUP_BACKFILL_SECONDS backfill are not included. Results
+        are cached until the next refresh; treat the returned dict as read-only.
+        """
+        cache_key = (agent_type or None, time_range_hours)
+        cached = self._stats_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        async with self.connection() as conn:
             try:
-                conditions = [f"request_timestamp > NOW() - INTERVAL '{time_range_hours} hours'"]
-                params = []
-
-                if agent_type:
-                    conditions.append("agent_type = $1")
-                    params.append(agent_type)
-
-                where_clause = "WHERE " + " AND ".join(conditions)
-
-                query = f"""
-                    SELECT 
-                        agent_type,
-                        COUNT(*) as total_requests,
-                        AVG(response_time_ms) as avg_response_time,
-                        PERCENTILE_CONT(0.95) WITHIN GROUP (ORDER BY response_time_ms) 
-                            as p95_response_time,
-                        SUM(token_count) as total_tokens,
-                        AVG(token_count) as avg_tokens,
-                        SUM(CASE WHEN success THEN 1 ELSE 0 END)::FLOAT / COUNT(*) as success_rate,
-                        SUM(cost_estimate) as total_cost,
-                        AVG(user_feedback) as avg_feedback
-                    FROM agent_metrics 
-                    {where_clause}
-                    GROUP BY agent_type
-                    ORDER BY total_requests DESC
-                """
-
-                rows = await conn.fetch(query, *params)
+                rows = await conn.fetch(AGENT_STATS_SQL, time_range_hours, agent_type or None)
 
                 stats = []
                 for row in rows:
+                    total_requests = row["total_requests"]
+                    feedback_count = row["feedback_count"]
                     stats.append(
                         {
                             "agent_type": row["agent_type"],
-                            "total_requests": row["total_requests"],
-                            "avg_response_time_ms": float(row["avg_response_time"] or 0),
-                            "p95_response_time_ms": float(row["p95_response_time"] or 0),
-                            "total_tokens": row["total_tokens"] or 0,
-                            "avg_tokens": float(row["avg_tokens"] or 0),
-                            "success_rate": float(row["success_rate"] or 0),
-                            "total_cost": float(row["total_cost"] or 0),
-                            "avg_user_feedback": float(row["avg_feedback"] or 0),
+                            "total_requests": total_requests,
+                            "avg_response_time_ms": row["response_time_sum"] / total_requests,
+                            "p95_response_time_ms": _histogram_quantile(
+                                0.95, row["latency_histograms"]
+                            ),
+                            "total_tokens": row["total_tokens"],
+                            "avg_tokens": row["total_tokens"] / total_requests,
+                            "success_rate": row["success_count"] / total_requests,
+                            "total_cost": float(row["total_cost"]),
+                            "avg_user_feedback": (
+                                row["feedback_sum"] / feedback_count if feedback_count else 0.0
+                            ),
                         }
                     )
 
-                return {"time_range_hours": time_range_hours, "agent_stats": stats}
+                result = {"time_range_hours": time_range_hours, "agent_stats": stats}
+                self._stats_cache[cache_key] = result
+                return result
 
             except Exception as e:
                 logger.error(f"Failed to get performance stats: {e}")
                 return {}
 
+    async def refresh_metrics_rollup(
+        self, lookback_seconds: int = ROLLUP_LOOKBACK_SECONDS, *, backfill: bool = False
+    ) -> bool:
+        """Rebuild the agent_metrics_rollup_5m buckets covering the last ``lookback_seconds``.
+
+        Returns False without refreshing when another process holds the rollup lock. With
+        ``backfill``, a database that has never been backfilled gets ROLLUP_BACKFILL_SECONDS
+        rebuilt instead, and is marked so no later call repeats it.
+        """
+        bounds = list(LATENCY_BOUNDS_MS)
+        async with self.connection() as conn, conn.transaction():
+            if not await conn.fetchval(TRY_ROLLUP_LOCK_SQL, ROLLUP_LOCK_KEY):
+                return False
+            if backfill and not await conn.fetchval(ROLLUP_BACKFILL_DONE_SQL):
+                await conn.execute(REFRESH_ROLLUP_SQL, bounds, ROLLUP_BACKFILL_SECONDS)
+                await conn.execute(MARK_ROLLUP_BACKFILL_SQL)
+            else:
+                await conn.execute(REFRESH_ROLLUP_SQL, bounds, lookback_seconds)
+        self._stats_cache.clear()
+        return True
+
+    async def _refresh_rollup_forever(self) -> None:
+        backfill = True
+        partitions_month = _month_start(datetime.now(UTC))
+        while True:
+            try:
+                # Until this process gets the lock once, another one may still be backfilling
+                if await self.refresh_metrics_rollup(backfill=backfill):
+                    backfill = False
+            except Exception as e:
+                logger.warning(f"Metrics rollup refresh failed: {e}")
+
+            # Roll the partition window forward once per month in long-running processes
+            month = _month_start(datetime.now(UTC))
+            if month != partitions_month:
+                try:
+                    async with self.connection() as conn:
+                        await self._ensure_partitions(conn)
+                    partitions_month = month
+                except Exception as e:
+                    logger.warning(f"Partition maintenance failed: {e}")
+            await asyncio.sleep(ROLLUP_REFRESH_INTERVAL)
+
     # Document Processing Logs
     async def log_document_processing(self, log: DocumentProcessingLog) -> bool:
         """Log document processing event."""
-        async with self.pool.acquire() as conn:
+        async with self.async_commit_pool.acquire() as conn:
             try:
-                await conn.execute(
-                    """
-                    INSERT INTO document_processing_logs 
-                    (log_id, document_id, session_id, processing_stage, status,
-                     timestamp, processing_time_ms, error_details, metadata)
-                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
-                """,
-                    log.log_id,
-                    log.document_id,
-                    log.session_id,
-                    log.processing_stage,
-                    log.status,
-                    log.timestamp,
-                    log.processing_time_ms,
-                    json.dumps(log.error_details) if log.error_details else None,
-                    json.dumps(log.metadata),
-                )
+                await conn.execute(INSERT_LOG_SQL, *_log_record(log))
 
                 return True
 
             except Exception as e:
-                logger.error(f"Failed to log document processing {log.log_id}: {e}")
+                logger.error(f"Failed to log processing event {log.log_id}: {e}")
+                return False
+
+    async def log_documents_batch(self, logs: list[DocumentProcessingLog]) -> bool:
+        """Log many document processing events in one executemany round-trip."""
+        if not logs:
+            return True
+
+        async with self.async_commit_pool.acquire() as conn:
+            try:
+                await conn.executemany(INSERT_LOG_SQL, [_log_record(log) for log in logs])
+
+                return True
+
+            except Exception as e:
+                logger.error(f"Failed to log {len(logs)} document processing event(s): {e}")
                 return False
 
     async def get_document_processing_history(
         self, document_id: str
     ) -> list[DocumentProcessingLog]:
         """Get processing history for a document."""
-        async with self.pool.acquire() as conn:
+        async with self.connection() as conn:
             try:
-                rows = await conn.fetch(
-                    """
-                    SELECT * FROM document_processing_logs 
-                    WHERE document_id = $1 
-                    ORDER BY timestamp ASC
-                """,
-                    document_id,
-                )
+                rows = await conn.fetch(GET_PROCESSING_HISTORY_SQL, document_id)
 
-                return [
-                    DocumentProcessingLog(
-                        log_id=row["log_id"],
-                        document_id=row["document_id"],
-                        session_id=row["session_id"],
-                        processing_stage=row["processing_stage"],
-                        status=row["status"],
-                        timestamp=row["timestamp"],
-                        processing_time_ms=row["processing_time_ms"],
-                        error_details=row["error_details"],
-                        metadata=row["metadata"],
-                    )
-                    for row in rows
-                ]
+                return [_log_from_row(row) for row in rows]
+
+            except Exception as e:
+                logger.error(f"Failed to get processing history for {document_id}: {e}")
+                return []
+
+    async def get_document_processing_history_raw(self, document_id: str) -> list[asyncpg.Record]:
+        """Get processing history as raw Records with ``timestamp`` in epoch seconds.
+
+        Columns are those of DocumentProcessingLog. No models are built; convert timestamps
+        with ``datetime.fromtimestamp(ts, UTC)`` only where a datetime is needed.
+        """
+        async with self.connection() as conn:
+            try:
+                return await conn.fetch(GET_PROCESSING_HISTORY_RAW_SQL, document_id)
 
             except Exception as e:
                 logger.error(f"Failed to get processing history for {document_id}: {e}")
@@ -2,11 +2,18 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import struct
+import time
 from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator
 from enum import Enum
+from itertools import islice
 from typing import Any
 
+import numpy as np
+import orjson
 from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
@@ -32,6 +39,152 @@ class VectorSearchResult(BaseModel):
     distance: float | None = None
 
 
+def _batches(items: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    """Split ``items`` into consecutive lists of at most ``size`` items."""
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+# One MERGE per batch: the source is a UNION ALL of one parameterized SELECT per row.
+# Vector and metadata travel as one JSON string each, parsed server-side, instead of the
+# connector quoting every float of the embedding separately.
+SNOWFLAKE_MERGE_SQL = """
+    MERGE INTO vector_embeddings t
+    USING ({source}) s
+    ON t.id = s.id
+    WHEN MATCHED THEN UPDATE SET vector = s.vector, metadata = s.metadata
+    WHEN NOT MATCHED THEN INSERT (id, vector, metadata)
+        VALUES (s.id, s.vector, s.metadata)
+"""
+SNOWFLAKE_MERGE_ROW = "SELECT %s as id, PARSE_JSON(%s) as vector, PARSE_JSON(%s) as metadata"
+
+
+COCKROACH_UPSERT_SQL = "UPSERT INTO vector_embeddings (id, vector, metadata) VALUES ($1, $2, $3)"
+
+
+def _json_text(value: Any) -> str:
+    return orjson.dumps(value).decode()
+
+
+def _json_object(value: Any) -> dict[str, Any]:
+    """Metadata as a dict; Snowflake hands VARIANT columns back as JSON text."""
+    if isinstance(value, str | bytes):
+        return orjson.loads(value)
+    return value or {}
+
+
+def _encode_vector(value: Any) -> bytes:
+    """pgvector binary format: int16 dimensions, int16 unused, then big-endian float32s."""
+    array = np.asarray(value, dtype=">f4")
+    return struct.pack(">HH", array.shape[0], 0) + array.tobytes()
+
+
+def _decode_vector(data: bytes) -> np.ndarray:
+    (dimensions,) = struct.unpack_from(">H", data)
+    return np.frombuffer(data, dtype=">f4", count=dimensions, offset=4).astype(np.float32)
+
+
+async def _init_cockroach_connection(conn: Any) -> None:
+    """Pool init hook: JSONB as orjson-coded dicts and pgvector ``vector`` as binary float32."""
+    await conn.set_type_codec(
+        "jsonb", encoder=_json_text, decoder=orjson.loads, schema="pg_catalog"
+    )
+    try:
+        # Without a codec asyncpg only accepts vector parameters as text literals
+        await conn.set_type_codec(
+            "vector", encoder=_encode_vector, decoder=_decode_vector, format="binary"
+        )
+    except ValueError:
+        pass  # pgvector is not installed (yet); initialize() recycles connections once it is
+
+
+# Without pgvector, CockroachDB searches run against an in-process copy of the table, reloaded
+# after local writes or once it is this many seconds old (to pick up other writers)
+LOCAL_INDEX_TTL = 60.0
+
+COCKROACH_PGVECTOR_SEARCH_SQL = """
+    SELECT
+        id,
+        metadata->>'content' as content,
+        metadata,
+        1 - (vector <-> $1::vector) as score,
+        vector <-> $1::vector as distance
+    FROM vector_embeddings
+    {filter_conditions}
+    ORDER BY vector <-> $1::vector
+    LIMIT $2
+"""
+COCKROACH_LOAD_VECTORS_SQL = "SELECT id, vector FROM vector_embeddings"
+COCKROACH_FILTER_IDS_SQL = "SELECT id FROM vector_embeddings {filter_conditions}"
+COCKROACH_HYDRATE_SQL = """
+    SELECT id, metadata->>'content' as content, metadata
+    FROM vector_embeddings
+    WHERE id = ANY($1::VARCHAR[])
+"""
+
+
+def _cockroach_filter_sql(filters: dict[str, Any] | None, params: list[Any]) -> str:
+    """WHERE clause for metadata filters; keys and values are bound by appending to ``params``.
+
+    Nothing from the filter is inlined and keys are visited in sorted order, so the SQL text
+    depends only on how many scalar and list filters there are. asyncpg's per-connection
+    statement cache then reuses one prepared plan for every filter of the same shape.
+    """
+    if not filters:
+        return ""
+    conditions = []
+    for key, value in sorted(filters.items()):
+        if isinstance(value, list):
+            # JSONB array overlap: the stored value contains any of the given strings
+            conditions.append(f"metadata->${len(params) + 1} ?| ${len(params) + 2}::text[]")
+            params.extend((key, [str(item) for item in value]))
+        else:
+            conditions.append(f"metadata->>${len(params) + 1} = ${len(params) + 2}")
+            params.extend((key, str(value)))
+    return "WHERE " + " AND ".join(conditions)
+
+
+class _LocalVectorIndex:
+    """Unit-normalized float32 matrix of stored vectors for exact cosine search in numpy."""
+
+    def __init__(self, ids: list[str], vectors: list[list[float]]):
+        self.ids = ids
+        self.positions = {vector_id: i for i, vector_id in enumerate(ids)}
+        if ids:
+            matrix = np.asarray(vectors, dtype=np.float32).reshape(len(ids), -1)
+        else:
+            # An empty table has no dimension to reshape to; it is still cached like any other
+            matrix = np.empty((0, 0), dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self.matrix = matrix / norms
+        self.loaded_at = time.monotonic()
+
+    def search(
+        self, query_vector: list[float], k: int, allowed: set[str] | None = None
+    ) -> list[tuple[str, float]]:
+        """Top ``k`` (id, cosine similarity) pairs, best first, optionally within ``allowed``."""
+        if not self.ids:
+            return []
+        query = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        scores = self.matrix @ (query / norm if norm else query)
+        if allowed is not None:
+            candidates = np.fromiter(
+                (self.positions[i] for i in allowed if i in self.positions), dtype=np.intp
+            )
+        else:
+            candidates = np.arange(len(self.ids))
+        k = min(k, len(candidates))
+        if k <= 0:
+            return []
+        # argpartition finds the top k in O(n); only those k are fully sorted
+        top = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        top = top[np.argsort(-scores[top])]
+        return [(self.ids[i], float(scores[i])) for i in top]
+
+
 class VectorAdapter(ABC):
     """Abstract base class for vector database adapters."""
 
@@ -149,12 +302,12 @@ class VertexAIAdapter(VectorAdapter):
             results = []
             for neighbor in response[0]:
                 results.append(
-                    VectorSearchResult(
+                    VectorSearchResult.model_construct(
                         id=neighbor.datapoint_id,
                         content=neighbor.restricts.get("content", [""])[0],
                         metadata={r.namespace: r.allow_list[0] for r in neighbor.restricts},
-                        score=1 - neighbor.distance,  # Convert distance to similarity
-                        distance=neighbor.distance,
+                        score=1 - float(neighbor.distance),  # Convert distance to similarity
+                        distance=float(neighbor.distance),
                     )
                 )
 
@@ -196,8 +349,9 @@ class VertexAIAdapter(VectorAdapter):
 class SnowflakeAdapter(VectorAdapter):
     """Snowflake Cortex vector adapter."""
 
-    def __init__(self, connection_params: dict[str, str]):
+    def __init__(self, connection_params: dict[str, str], batch_size: int = 64):
         self.connection_params = connection_params
+        self.batch_size = batch_size
         self.connection = None
 
     async def initialize(self) -> None:
@@ -232,18 +386,18 @@ class SnowflakeAdapter(VectorAdapter):
                 )
             """)
 
-            # Insert vectors
-            for vector, metadata, vector_id in zip(vectors, metadatas, ids, strict=False):
+            # Keyed by id (last write wins): MERGE rejects a source with duplicate keys
+            rows = {
+                vector_id: (vector_id, _json_text(vector), _json_text(metadata))
+                for vector, metadata, vector_id in zip(vectors, metadatas, ids, strict=False)
+            }
+
+            # One round-trip per batch instead of one per vector
+            for batch in _batches(rows.values(), self.batch_size):
+                source = " UNION ALL ".join([SNOWFLAKE_MERGE_ROW] * len(batch))
                 cursor.execute(
-                    """
-                    MERGE INTO vector_embeddings t
-                    USING (SELECT %s as id, %s as vector, %s as metadata) s
-                    ON t.id = s.id
-                    WHEN MATCHED THEN UPDATE SET vector = s.vector, metadata = s.metadata
-                    WHEN NOT MATCHED THEN INSERT (id, vector, metadata) 
-                        VALUES (s.id, s.vector, s.metadata)
-                """,
-                    (vector_id, vector, metadata),
+                    SNOWFLAKE_MERGE_SQL.format(source=source),
+                    [param for row in batch for param in row],
                 )
 
             logger.info(f"Added {len(vectors)} vectors to Snowflake")
@@ -291,8 +445,11 @@ class SnowflakeAdapter(VectorAdapter):
             results = cursor.fetchall()
 
             return [
-                VectorSearchResult(
-                    id=row[0], content=row[1] or "", metadata=row[2] or {}, score=float(row[3])
+                VectorSearchResult.model_construct(
+                    id=row[0],
+                    content=row[1] or "",
+                    metadata=_json_object(row[2]),
+                    score=float(row[3]),
                 )
                 for row in results
             ]
@@ -333,16 +490,27 @@ class SnowflakeAdapter(VectorAdapter):
 class CockroachDBAdapter(VectorAdapter):
     """CockroachDB vector adapter - Bonus points! 🎯"""
 
-    def __init__(self, connection_string: str):
+    def __init__(
+        self, connection_string: str, batch_size: int = 500, max_concurrent_batches: int = 4
+    ):
         self.connection_string = connection_string
+        # Large ingests are split into batches written concurrently on separate pooled
+        # connections; the cap leaves the rest of the pool free for searches
+        self.batch_size = batch_size
+        self.max_concurrent_batches = max_concurrent_batches
         self.pool = None
+        # Whether pgvector can serve searches; detected once in initialize()
+        self._has_vector_ext = False
+        self._local_index: _LocalVectorIndex | None = None
 
     async def initialize(self) -> None:
         """Initialize CockroachDB connection."""
         try:
             import asyncpg
 
-            self.pool = await asyncpg.create_pool(self.connection_string)
+            self.pool = await asyncpg.create_pool(
+                self.connection_string, init=_init_cockroach_connection
+            )
 
             # Create vector extension and table
             async with self.pool.acquire() as conn:
@@ -376,6 +544,19 @@ class CockroachDBAdapter(VectorAdapter):
                         ON vector_embeddings USING gin (vector)
                     """)
 
+                # Preparing (not running) the search resolves pgvector's type and operators,
+                # so one probe settles which search path every later query takes
+                try:
+                    await conn.prepare(COCKROACH_PGVECTOR_SEARCH_SQL.format(filter_conditions=""))
+                    self._has_vector_ext = True
+                except Exception as e:
+                    logger.warning(f"pgvector search unavailable, using an in-process index: {e}")
+                    self._has_vector_ext = False
+
+            if self._has_vector_ext:
+                # Connections opened before CREATE EXTENSION have no vector codec; replace them
+                await self.pool.expire_connections()
+
             logger.info("Initialized CockroachDB vector adapter")
 
         except ImportError:
@@ -390,19 +571,23 @@ class CockroachDBAdapter(VectorAdapter):
     ) -> bool:
         """Add vectors to CockroachDB."""
         try:
-            async with self.pool.acquire() as conn:
-                # Batch insert with UPSERT
-                for vector, metadata, vector_id in zip(vectors, metadatas, ids, strict=False):
-                    await conn.execute(
-                        """
-                        UPSERT INTO vector_embeddings (id, vector, metadata)
-                        VALUES ($1, $2, $3)
-                    """,
-                        vector_id,
-                        vector,
-                        metadata,
-                    )
+            # Keyed by id (last write wins) so concurrent batches never race on the same row
+            records = {
+                vector_id: (vector_id, vector, metadata)
+                for vector, metadata, vector_id in zip(vectors, metadatas, ids, strict=False)
+            }
+            semaphore = asyncio.Semaphore(self.max_concurrent_batches)
 
+            async def upsert(batch: list[tuple[str, list[float], dict[str, Any]]]) -> None:
+                async with semaphore, self.pool.acquire() as conn:
+                    # One prepared UPSERT executed for every row in a single pipelined call
+                    await conn.executemany(COCKROACH_UPSERT_SQL, batch)
+
+            await asyncio.gather(
+                *(upsert(batch) for batch in _batches(records.values(), self.batch_size))
+            )
+
+            self._local_index = None
             logger.info(f"Added {len(vectors)} vectors to CockroachDB")
             return True
 
@@ -416,67 +601,17 @@ class CockroachDBAdapter(VectorAdapter):
         """Search similar vectors in CockroachDB."""
         try:
             async with self.pool.acquire() as conn:
-                # Build filter conditions
-                filter_conditions = ""
-                params = [query_vector, k]
-
-                if filters:
-                    conditions = []
-                    for key, value in filters.items():
-                        if isinstance(value, list):
-                            # Use JSONB array containment
-                            conditions.append(f"metadata->'{key}' ?| ARRAY{value}")
-                        else:
-                            conditions.append(f"metadata->>'{key}' = ${len(params) + 1}")
-                            params.append(str(value))
-
-                    if conditions:
-                        filter_conditions = "WHERE " + " AND ".join(conditions)
-
-                # Use vector similarity (or fallback to array operations)
-                try:
-                    # Try with vector extension
-                    query = f"""
-                        SELECT 
-                            id,
-                            metadata->>'content' as content,
-                            metadata,
-                            1 - (vector <-> $1::vector) as score,
-                            vector <-> $1::vector as distance
-                        FROM vector_embeddings
-                        {filter_conditions}
-                        ORDER BY vector <-> $1::vector
-                        LIMIT $2
-                    """
-                except:
-                    # Fallback to manual cosine similarity
-                    query = f"""
-                        SELECT 
-                            id,
-                            metadata->>'content' as content,
-                            metadata,
-                            -- Manual cosine similarity calculation
-                            (
-                                SELECT SUM(a * b) / (
-                                    SQRT(SUM(a * a)) * SQRT(SUM(b * b))
-                                )
-                                FROM (
-                                    SELECT 
-                                        vector[i] as a,
-                                        ($1::FLOAT8[])[i] as b
-                                    FROM generate_subscripts(vector, 1) i
-                                ) sub
-                            ) as score
-                        FROM vector_embeddings
-                        {filter_conditions}
-                        ORDER BY score DESC
-                        LIMIT $2
-                    """
+                if not self._has_vector_ext:
+                    return await self._local_search(conn, query_vector, k, filters)
 
+                params = [np.asarray(query_vector, dtype=np.float32), k]
+                query = COCKROACH_PGVECTOR_SEARCH_SQL.format(
+                    filter_conditions=_cockroach_filter_sql(filters, params)
+                )
                 results = await conn.fetch(query, *params)
 
                 return [
-                    VectorSearchResult(
+                    VectorSearchResult.model_construct(
                         id=row["id"],
                         content=row["content"] or "",
                         metadata=row["metadata"] or {},
@@ -490,6 +625,42 @@ class CockroachDBAdapter(VectorAdapter):
             logger.error(f"Failed to search CockroachDB: {e}")
             return []
 
+    async def _local_search(
+        self, conn: Any, query_vector: list[float], k: int, filters: dict[str, Any] | None
+    ) -> list[VectorSearchResult]:
+        """Rank in numpy, then fetch metadata for just the top ``k`` rows."""
+        index = self._local_index
+        if index is None or time.monotonic() - index.loaded_at > LOCAL_INDEX_TTL:
+            rows = await conn.fetch(COCKROACH_LOAD_VECTORS_SQL)
+            index = self._local_index = _LocalVectorIndex(
+                [row["id"] for row in rows], [row["vector"] for row in rows]
+            )
+
+        allowed = None
+        if filters:
+            params: list[Any] = []
+            query = COCKROACH_FILTER_IDS_SQL.format(
+                filter_conditions=_cockroach_filter_sql(filters, params)
+            )
+            allowed = {row["id"] for row in await conn.fetch(query, *params)}
+
+        ranked = index.search(query_vector, k, allowed)
+        if not ranked:
+            return []
+        hydrated = await conn.fetch(COCKROACH_HYDRATE_SQL, [vector_id for vector_id, _ in ranked])
+        rows = {row["id"]: row for row in hydrated}
+        return [
+            VectorSearchResult.model_construct(
+                id=vector_id,
+                content=rows[vector_id]["content"] or "",
+                metadata=rows[vector_id]["metadata"] or {},
+                score=score,
+                distance=1 - score,
+            )
+            for vector_id, score in ranked
+            if vector_id in rows
+        ]
+
     async def delete_vectors(self, ids: list[str]) -> bool:
         """Delete vectors from CockroachDB."""
         try:
@@ -502,6 +673,7 @@ class CockroachDBAdapter(VectorAdapter):
                     ids,
                 )
 
+            self._local_index = None
             logger.info(f"Deleted {len(ids)} vectors from CockroachDB")
             return True
 
@@ -570,45 +742,67 @@ class VectorAdapterFactory:
 
 # Dependency injection
 _vector_adapter: VectorAdapter | None = None
+_vector_adapter_init: asyncio.Task[VectorAdapter] | None = None
 
 
-async def get_vector_adapter() -> VectorAdapter:
-    """Get vector adapter instance (dependency injection)."""
+async def _create_vector_adapter() -> VectorAdapter:
+    """Build and initialize the configured adapter."""
     global _vector_adapter
 
-    if _vector_adapter is None:
-        from app.config import get_settings
-
-        settings = get_settings()
-
-        # Configuration based on environment
-        if settings.vector_db_type == "vertex":
-            config = {
-                "project_id": settings.gcp_project_id,
-                "region": settings.gcp_region,
-                "index_endpoint_id": settings.vertex_index_endpoint_id,
-            }
-        elif settings.vector_db_type == "snowflake":
-            config = {
-                "connection_params": {
-                    "account": settings.snowflake_account,
-                    "user": settings.snowflake_user,
-                    "password": settings.snowflake_password,
-                    "database": settings.snowflake_database,
-                    "schema": settings.snowflake_schema,
-                }
+    from app.config import get_settings
+
+    settings = get_settings()
+
+    # Configuration based on environment
+    if settings.vector_db_type == "vertex":
+        config = {
+            "project_id": settings.vector_db.gcp_project_id,
+            "region": settings.vector_db.gcp_region,
+            "index_endpoint_id": settings.vector_db.vertex_index_endpoint_id,
+        }
+    elif settings.vector_db_type == "snowflake":
+        config = {
+            "connection_params": {
+                "account": settings.vector_db.snowflake_account,
+                "user": settings.vector_db.snowflake_user,
+                "password": settings.vector_db.snowflake_password,
+                "database": settings.vector_db.snowflake_database,
+                "schema": settings.vector_db.snowflake_schema,
             }
-        elif settings.vector_db_type == "cockroach":
-            config = {"connection_string": settings.cockroach_connection_string}
-        else:
-            # Fallback to ChromaDB
-            from app.rag_service import RAGService
+        }
+    elif settings.vector_db_type == "cockroach":
+        config = {"connection_string": settings.vector_db.cockroach_connection_string}
+    else:
+        # Fallback to ChromaDB
+        from app.rag_service import RAGService
 
-            return RAGService().vector_store  # Use existing implementation
+        return RAGService().vector_store  # Use existing implementation
+
+    adapter = VectorAdapterFactory.create_adapter(VectorDBType(settings.vector_db_type), config)
+    await adapter.initialize()
+    # Only published once initialized, so no caller sees a half-built adapter
+    _vector_adapter = adapter
+    return adapter
 
-        _vector_adapter = VectorAdapterFactory.create_adapter(
-            VectorDBType(settings.vector_db_type), config
-        )
-        await _vector_adapter.initialize()
 
-    return _vector_adapter
+async def get_vector_adapter() -> VectorAdapter:
+    """Get vector adapter instance (dependency injection).
+
+    Concurrent first callers await one shared initialization task instead of each opening
+    their own pools; a failed initialization is retried by the next caller.
+    """
+    global _vector_adapter_init
+
+    if _vector_adapter is not None:
+        return _vector_adapter
+
+    if _vector_adapter_init is None:
+        _vector_adapter_init = asyncio.create_task(_create_vector_adapter())
+    init = _vector_adapter_init
+    try:
+        # Shielded so one cancelled request does not abort startup for the others
+        return await asyncio.shield(init)
+    except Exception:
+        if _vector_adapter_init is init:
+            _vector_adapter_init = None
+        raise
@@ -232,7 +232,7 @@ class HybridAgentService:
         # Prepare initial state
         initial_state: HybridAgentState = {
             "question": question,
-            "messages": history + [HumanMessage(content=question)],
+            "messages": [*history, HumanMessage(content=question)],
             "log": ["[hybrid-start] Starting hybrid LangGraph + Pydantic-AI execution"],
         }
 
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .config import get_settings
+from .database.mongodb_adapter import close_mongodb_adapter, get_mongodb_adapter
 from .logging_middleware import request_id_middleware
 from .middleware_guardrails import (
     rate_limit_middleware,
@@ -23,9 +27,20 @@ from .routers_tasks import tasks_router
 from .telemetry import instrument_app, setup_telemetry
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Connect configured databases at startup so no request pays the connect cost."""
+    if get_settings().mongodb_url:
+        await get_mongodb_adapter()
+    try:
+        yield
+    finally:
+        await close_mongodb_adapter()
+
+
 def create_app() -> FastAPI:
     settings = get_settings()
-    app = FastAPI(title="Python AI Learning API", version="0.1.0")
+    app = FastAPI(title="Python AI Learning API", version="0.1.0", lifespan=lifespan)
     refresh_rate_limiter()
 
     # Setup OpenTelemetry
@@ -25,12 +25,12 @@ class RAGService:
             model_name=model_name
         )
         self.collection = self.client.get_or_create_collection(name="documents")
+        self.embedding_model = model_name
         self._embedding_cache: dict[str, list[float]] = {}
 
     def ingest(self, docs: Iterable[tuple[str, str] | tuple[str, str, dict[str, Any]]]) -> int:
         ids: list[str] = []
         texts: list[str] = []
-        embeddings: list[list[float]] = []
         metadatas: list[dict[str, Any]] = []
         for item in docs:
             if len(item) == 3:
@@ -41,14 +41,10 @@ class RAGService:
             ids.append(doc_id)
             texts.append(text)
             metadatas.append(metadata)
-            if text in self._embedding_cache:
-                embeddings.append(self._embedding_cache[text])
-            else:
-                emb = self.embedder([text])[0]
-                self._embedding_cache[text] = emb
-                embeddings.append(emb)
         if not ids:
             return 0
+        # Repeated texts are embedded once, and all misses go through a single batch
+        embeddings = self.embed_texts(texts)
         self.collection.upsert(
             ids=ids,
             documents=texts,
@@ -57,8 +53,48 @@ class RAGService:
         )
         return len(ids)
 
-    def retrieve(self, query: str, k: int = 4, include_metadata: bool = False):
-        results = self.collection.query(query_texts=[query], n_results=k)
+    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        """Embed texts, reusing cached vectors and batching the misses into one call."""
+        missing = [text for text in dict.fromkeys(texts) if text not in self._embedding_cache]
+        if missing:
+            for text, emb in zip(missing, self.embedder(missing), strict=True):
+                self._embedding_cache[text] = emb
+        return [self._embedding_cache[text] for text in texts]
+
+    def ingest_precomputed(
+        self,
+        docs: Iterable[tuple[str, str, dict[str, Any]]],
+        embeddings: Iterable[list[float]],
+    ) -> int:
+        """Upsert chunks whose embeddings were computed ahead of time (skips the embedder)."""
+        ids: list[str] = []
+        texts: list[str] = []
+        metadatas: list[dict[str, Any]] = []
+        vectors: list[list[float]] = []
+        for (doc_id, text, metadata), emb in zip(docs, embeddings, strict=True):
+            ids.append(doc_id)
+            texts.append(text)
+            metadatas.append(metadata)
+            vectors.append(emb)
+            self._embedding_cache.setdefault(text, emb)
+        if not ids:
+            return 0
+        self.collection.upsert(
+            ids=ids,
+            documents=texts,
+            embeddings=vectors,
+            metadatas=metadatas,
+        )
+        return len(ids)
+
+    def retrieve(
+        self,
+        query: str,
+        k: int = 4,
+        include_metadata: bool = False,
+        where: dict[str, Any] | None = None,
+    ):
+        results = self.collection.query(query_texts=[query], n_results=k, where=where)
         documents = results.get("documents", [[""]])[0]
         if not include_metadata:
             return documents
@@ -97,10 +133,13 @@ class RAGService:
         if doc_ids_to_delete:
             self.collection.delete(ids=doc_ids_to_delete)
 
-    def retrieve_with_sources(self, query: str, k: int = 4):
+    def retrieve_with_sources(self, query: str, k: int = 4, where: dict[str, Any] | None = None):
         """Retrieve documents with source metadata for citations."""
         results = self.collection.query(
-            query_texts=[query], n_results=k, include=["documents", "metadatas", "distances"]
+            query_texts=[query],
+            n_results=k,
+            where=where,
+            include=["documents", "metadatas", "distances"],
         )
 
         documents = results.get("documents", [[]])[0]
@@ -50,12 +50,12 @@ async def chat(
 
     state = {
         "question": request.message,
-        "messages": history + [HumanMessage(content=request.message)],
+        "messages": [*history, HumanMessage(content=request.message)],
         "log": [],
     }
 
     # Run the agent graph
-    config = {"configurable": {"thread_id": session_key}}
+    config = agent_service.graph_config(session_key)
     async for event in agent_service.graph.astream(state, config=config):
         for node_state in event.values():
             if isinstance(node_state, dict):
@@ -0,0 +1,49 @@
+# ruff: noqa: S101 - pytest-style asserts expected
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+import run_agent_evals
+
+
+class CountingRAG:
+    embedding_model = "test-model"
+
+    def __init__(self) -> None:
+        self.embed_calls: list[list[str]] = []
+
+    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        self.embed_calls.append(list(texts))
+        return [[float(len(text)), 0.5] for text in texts]
+
+
+def test_load_or_embed_chunks_reuses_disk_cache(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(run_agent_evals, "EMBED_CACHE_DIR", tmp_path)
+    rag = CountingRAG()
+
+    chunks, vectors = run_agent_evals._load_or_embed_chunks(rag, "alpha beta gamma")
+    assert len(rag.embed_calls) == 1
+    assert len(list(tmp_path.glob("*.npy"))) == 1
+
+    cached_chunks, cached_vectors = run_agent_evals._load_or_embed_chunks(rag, "alpha beta gamma")
+    assert len(rag.embed_calls) == 1
+    assert cached_chunks == chunks
+    assert cached_vectors == vectors  # exactly representable in float32
+
+
+def test_load_or_embed_chunks_keys_on_chunking_params(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(run_agent_evals, "EMBED_CACHE_DIR", tmp_path)
+    rag = CountingRAG()
+
+    run_agent_evals._load_or_embed_chunks(rag, "alpha beta gamma")
+    monkeypatch.setattr(run_agent_evals, "CHUNK_SIZE", run_agent_evals.CHUNK_SIZE // 2)
+    run_agent_evals._load_or_embed_chunks(rag, "alpha beta gamma")
+
+    assert len(rag.embed_calls) == 2
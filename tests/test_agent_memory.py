@@ -0,0 +1,82 @@
+# ruff: noqa: S101 - pytest-style asserts expected
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import orjson
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.agent_memory import InMemoryAgentMemory, RedisAgentMemory
+
+
+def test_in_memory_read_returns_snapshot_tuple() -> None:
+    memory = InMemoryAgentMemory(max_turns=1)
+
+    async def run() -> None:
+        assert await memory.read("missing") == ()
+        await memory.append("s1", [HumanMessage(content="q"), AIMessage(content="a")])
+        snapshot = await memory.read("s1")
+        await memory.append("s1", [HumanMessage(content="q2")])
+        assert isinstance(snapshot, tuple)
+        assert [m.content for m in snapshot] == ["q", "a"]
+        assert [m.content for m in await memory.read("s1")] == ["a", "q2"]
+
+    asyncio.run(run())
+    assert "missing" not in memory._store
+
+
+def _memory_with_fake_client(ttl_seconds: int | None = 60) -> tuple[RedisAgentMemory, MagicMock]:
+    memory = RedisAgentMemory.__new__(RedisAgentMemory)
+    client = MagicMock()
+    pipe = MagicMock()
+    pipe.execute = AsyncMock(return_value=[])
+    client.pipeline.return_value.__aenter__ = AsyncMock(return_value=pipe)
+    client.pipeline.return_value.__aexit__ = AsyncMock(return_value=False)
+    memory._client = client
+    memory._max_messages = 4
+    memory._ttl_seconds = ttl_seconds
+    memory._prefix = "agent:session"
+    return memory, pipe
+
+
+def test_redis_memory_append_pushes_trims_and_expires() -> None:
+    memory, pipe = _memory_with_fake_client()
+
+    asyncio.run(memory.append("s1", [HumanMessage(content="hi"), AIMessage(content="hello")]))
+
+    key = "agent:session:s1:messages"
+    pipe.rpush.assert_called_once_with(
+        key, orjson.dumps(("human", "hi")), orjson.dumps(("ai", "hello"))
+    )
+    pipe.ltrim.assert_called_once_with(key, -4, -1)
+    pipe.expire.assert_called_once_with(key, 60)
+    pipe.execute.assert_awaited_once()
+
+
+def test_redis_memory_append_without_ttl_skips_expire() -> None:
+    memory, pipe = _memory_with_fake_client(ttl_seconds=None)
+
+    asyncio.run(memory.append("s1", [HumanMessage(content="hi")]))
+
+    pipe.expire.assert_not_called()
+
+
+def test_redis_memory_read_round_trips_and_skips_malformed_entries() -> None:
+    memory, _ = _memory_with_fake_client()
+    memory._client.lrange = AsyncMock(
+        return_value=[
+            orjson.dumps(("human", "question")),
+            b"not json",
+            orjson.dumps([1, 2]),
+            orjson.dumps({"type": "ai", "content": "old layout"}),
+            orjson.dumps(("ai", "answer")),
+        ]
+    )
+
+    messages = asyncio.run(memory.read("s1"))
+
+    memory._client.lrange.assert_awaited_once_with("agent:session:s1:messages", 0, -1)
+    assert [type(m) for m in messages] == [HumanMessage, AIMessage]
+    assert [m.content for m in messages] == ["question", "answer"]
@@ -8,7 +8,7 @@ from collections.abc import AsyncIterator
 from langchain_core.messages import AIMessage, HumanMessage
 
 from app.agent_memory import InMemoryAgentMemory
-from app.agent_service import AgentService
+from app.agent_service import AgentService, _compiled_graph
 
 
 class FakeRAG:
@@ -114,3 +114,65 @@ def test_agent_service_streams_reasoning_and_updates_memory() -> None:
         assert isinstance(stored[-1], AIMessage)
 
     asyncio.run(run())
+
+
+def test_route_question_matches_whole_web_keywords() -> None:
+    rag = FakeRAG([])
+    service = AgentService(rag=rag, ai=FakeAI(), web=FakeWeb([]), memory=InMemoryAgentMemory())
+
+    assert service._route_question("What is the latest FastAPI release?", [])[0] == "web"
+    assert service._route_question("Summarize https://example.com", [])[0] == "web"
+    assert service._route_question("How do webhooks work currently?", [])[0] == "rag"
+
+
+def test_agent_services_share_compiled_graph_but_use_own_service() -> None:
+    rag_a = FakeRAG(["alpha context"])
+    rag_b = FakeRAG(["beta context"])
+    service_a = AgentService(rag=rag_a, ai=FakeAI(), web=None, memory=InMemoryAgentMemory())
+    service_b = AgentService(rag=rag_b, ai=FakeAI(), web=None, memory=InMemoryAgentMemory())
+
+    assert service_a.graph is service_b.graph is _compiled_graph(with_web=False)
+
+    async def run() -> None:
+        state_a = {"question": "qa", "messages": [HumanMessage(content="qa")], "log": []}
+        state_b = {"question": "qb", "messages": [HumanMessage(content="qb")], "log": []}
+        result_a, result_b = await asyncio.gather(
+            service_a.graph.ainvoke(state_a, config=service_a.graph_config("a")),
+            service_b.graph.ainvoke(state_b, config=service_b.graph_config("b")),
+        )
+        assert result_a["contexts"] == ["alpha context"]
+        assert result_b["contexts"] == ["beta context"]
+        assert "qa" in rag_a.queries and "qb" not in rag_a.queries
+        assert "qb" in rag_b.queries and "qa" not in rag_b.queries
+
+    asyncio.run(run())
+
+
+def test_agent_service_streams_each_node_breadcrumb_once() -> None:
+    ai = FakeAI(stream_chunks=["answer"])
+    web = FakeWeb(["web snippet"])
+
+    async def run() -> None:
+        service = AgentService(rag=FakeRAG([]), ai=ai, web=web, memory=InMemoryAgentMemory())
+        stream = await service.answer("latest news", stream=True, session="s4")
+        chunks = [piece async for piece in stream]
+        breadcrumbs = [chunk for chunk in chunks if chunk.startswith("[")]
+        assert breadcrumbs == [
+            "[route] WEB — Detected recency/web intent\n",
+            "[web] Retrieved 1 snippet(s) from Tavily.\n",
+        ]
+        assert ai.calls[0][1] == ["web snippet"]
+
+    asyncio.run(run())
+
+
+def test_agent_graph_without_web_has_no_web_node() -> None:
+    service = AgentService(
+        rag=FakeRAG(["doc"]), ai=FakeAI(), web=None, memory=InMemoryAgentMemory()
+    )
+    with_web = AgentService(
+        rag=FakeRAG(["doc"]), ai=FakeAI(), web=FakeWeb([]), memory=InMemoryAgentMemory()
+    )
+
+    assert "web" not in service.graph.get_graph().nodes
+    assert "web" in with_web.graph.get_graph().nodes
@@ -0,0 +1,88 @@
+# ruff: noqa: S101 - pytest-style asserts expected
+
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import orjson
+
+import eval_common
+from eval_common import count_hits, reload_corpora, request_with_retries
+
+
+def test_count_hits_is_case_insensitive() -> None:
+    assert count_hits("FastAPI uses Pydantic", ["fastapi", "PYDANTIC", "django"]) == 2
+
+
+def test_count_hits_finds_tokens_nested_in_longer_matches() -> None:
+    assert count_hits("I love Python", ["py", "python", "PY"]) == 3
+
+
+def test_count_hits_without_expected_tokens() -> None:
+    assert count_hits("anything", []) == 0
+
+
+def test_request_with_retries_retries_gateway_errors(monkeypatch) -> None:
+    statuses = iter([503, 502, 200])
+    seen: list[int] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        status = next(statuses)
+        seen.append(status)
+        return httpx.Response(status)
+
+    async def no_sleep(_delay: float) -> None:
+        return None
+
+    monkeypatch.setattr(eval_common.asyncio, "sleep", no_sleep)
+
+    async def run() -> httpx.Response:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await request_with_retries(client, "GET", "http://test/ask")
+
+    resp = asyncio.run(run())
+    assert resp.status_code == 200
+    assert seen == [503, 502, 200]
+
+
+def test_request_with_retries_gives_up_after_max_retries(monkeypatch) -> None:
+    calls: list[int] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(1)
+        return httpx.Response(504)
+
+    async def no_sleep(_delay: float) -> None:
+        return None
+
+    monkeypatch.setattr(eval_common.asyncio, "sleep", no_sleep)
+
+    async def run() -> httpx.Response:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await request_with_retries(client, "GET", "http://test/ask")
+
+    assert asyncio.run(run()).status_code == 504
+    assert len(calls) == eval_common.MAX_RETRIES + 1
+
+
+def test_reload_corpora_posts_each_distinct_doc_set_once() -> None:
+    bodies: list[bytes] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.params["background"] == "false"
+        bodies.append(request.content)
+        return httpx.Response(200, json={"ingested": 1})
+
+    cases = [
+        {"docs": [["a", "alpha"]]},
+        {"docs": [["b", "beta"]]},
+        {"docs": [["a", "alpha"]]},
+    ]
+
+    async def run() -> int:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await reload_corpora(client, "http://test", cases)
+
+    assert asyncio.run(run()) == 2
+    assert [orjson.loads(body) for body in bodies] == [[["a", "alpha"]], [["b", "beta"]]]
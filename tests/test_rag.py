@@ -63,3 +63,55 @@ def test_rag_reload_background_enqueues_task() -> None:
     assert res.status_code == 200
     payload = res.json()
     assert payload["task_id"] == "task-1"
+
+
+def test_rag_retrieve_passes_metadata_filter() -> None:
+    from app.rag_service import RAGService
+
+    rag = RAGService.__new__(RAGService)
+    rag.collection = MagicMock()
+    rag.collection.query.return_value = {
+        "documents": [["scoped doc"]],
+        "metadatas": [[{"source_id": "case-a"}]],
+        "distances": [[0.1]],
+    }
+
+    assert rag.retrieve("q", where={"source_id": "case-a"}) == ["scoped doc"]
+    assert rag.collection.query.call_args.kwargs["where"] == {"source_id": "case-a"}
+
+    enriched = rag.retrieve_with_sources("q", k=2, where={"source_id": "case-a"})
+    assert enriched[0]["content"] == "scoped doc"
+    assert rag.collection.query.call_args.kwargs["where"] == {"source_id": "case-a"}
+
+
+def test_rag_embed_texts_batches_misses_and_ingest_precomputed_skips_embedder() -> None:
+    from app.rag_service import RAGService
+
+    rag = RAGService.__new__(RAGService)
+    rag.collection = MagicMock()
+    rag.embedder = MagicMock(side_effect=lambda texts: [[float(len(t))] for t in texts])
+    rag._embedding_cache = {"cached": [9.0]}
+
+    assert rag.embed_texts(["a", "cached", "bb", "a"]) == [[1.0], [9.0], [2.0], [1.0]]
+    rag.embedder.assert_called_once_with(["a", "bb"])
+
+    rag.embedder.reset_mock()
+    count = rag.ingest_precomputed([("id-1", "text", {"source_id": "s"})], [[0.5]])
+    assert count == 1
+    rag.embedder.assert_not_called()
+    assert rag.collection.upsert.call_args.kwargs["embeddings"] == [[0.5]]
+
+
+def test_rag_ingest_embeds_duplicate_texts_once() -> None:
+    from app.rag_service import RAGService
+
+    rag = RAGService.__new__(RAGService)
+    rag.collection = MagicMock()
+    rag.embedder = MagicMock(side_effect=lambda texts: [[float(len(t))] for t in texts])
+    rag._embedding_cache = {}
+
+    count = rag.ingest([("a", "same"), ("b", "other text"), ("c", "same")])
+
+    assert count == 3
+    rag.embedder.assert_called_once_with(["same", "other text"])
+    assert rag.collection.upsert.call_args.kwargs["embeddings"] == [[4.0], [10.0], [4.0]]